@@ -1,9 +1,33 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
+import os
 import time
-from kmap_logic import KMapSolver
+import uuid
+from kmap_logic import KMapSolver, PI_ENGINES
 from visualizer import KMapVisualizer
+from backends import select_backend
+from loaders import load_function, solver_from_outputs
+from metrics import METRICS, start_exporters
+from warmup import readiness, warm_up
+
+# Equally minimal covers offered in the solution selector
+MAX_ALTERNATIVES = 12
+ALTERNATIVES_BUDGET = 2.0  # seconds
+SOLVE_BUDGET = 3.0  # seconds
+# Widest function solved in the page: past it even writing out a fallback
+# cover takes longer than SOLVE_BUDGET (batch.py and service.py go further)
+MAX_SOLVE_VARS = 16
+
+# Solution log: individual prime implicants shown before only the round summaries are
+MAX_LOGGED_PRIMES = 32
+
+# Truth table rows rendered per page
+TABLE_PAGE_SIZE = 64
+
+# Longest term list written out in the solution log; longer ones are counted
+MAX_LISTED_TERMS = 16
 
 # Page Config
 st.set_page_config(
@@ -19,6 +43,23 @@ if 'theme' not in st.session_state:
 if 'page' not in st.session_state:
     st.session_state.page = 'home'
 
+# Operational metrics (see metrics.py); exporters start once per process
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+METRICS.touch_session(st.session_state.session_id)
+start_exporters()
+
+@st.cache_resource(show_spinner=False)
+def start_warm_up():
+    # Once per process, in the background while the first user reads the
+    # homepage (see warmup.py)
+    warm_up()
+    return True
+
+# Not when a spawned process imports this script as __mp_main__
+if __name__ == "__main__":
+    start_warm_up()
+
 # Theme colors
 if st.session_state.theme == 'dark':
     PRIMARY_BG = '#0E1117'
@@ -275,6 +316,30 @@ def render_sidebar_footer(show_back=False):
                 st.session_state.page = 'home'
                 st.rerun()
 
+        # Admin panel, opened with ?admin=1 or LOGICMAP_ADMIN=1
+        if st.query_params.get("admin") == "1" or os.environ.get("LOGICMAP_ADMIN") == "1":
+            render_admin_panel()
+
+def render_admin_panel():
+    stats = METRICS.snapshot()
+    warm = readiness()
+    with st.expander("📈 Admin: Metrics"):
+        if warm['ready']:
+            st.caption(f"Warm-up done in {warm['seconds']:.2f}s" + (f" ({warm['error']})" if warm['error'] else ""))
+        else:
+            st.caption("Warming up...")
+        st.metric("Active sessions", stats['active_sessions'])
+        st.metric("Process RSS", f"{stats['rss_bytes'] / 2**20:.1f} MB")
+        st.metric("Render time / frame", f"{stats['render_seconds'] * 1000:.1f} ms")
+        st.metric("Frames / animation", f"{stats['frames_per_animation']:.1f}")
+        for cache, rate in stats['cache_hit_rate'].items():
+            st.metric(f"Cache hit rate ({cache})", f"{rate:.0%}")
+        if stats['solve_seconds']:
+            st.markdown("**Solve latency by variables**")
+            st.table(pd.DataFrame(
+                [(n, f"{mean * 1000:.2f} ms", count) for n, (mean, count) in stats['solve_seconds'].items()],
+                columns=["Variables", "Mean", "Solves"]))
+
 # Homepage
 def show_homepage():
     # Logo
@@ -365,6 +430,107 @@ def show_homepage():
     # Render Footer
     render_sidebar_footer(show_back=False)
 
+# Truth Table (paged: only the visible window is built and styled)
+def highlight_output(val):
+    if val == 1:
+        return 'color: #00FF00; font-weight: bold'
+    elif val == 0:
+        return 'color: #FF5733'
+    elif val == 'X':
+        return 'color: #FF00FF; font-weight: bold'
+    return ''
+
+def render_truth_table(solver, outputs, mode_short):
+    target_value = 0 if mode_short == "POS" else 1
+    filters = {
+        "All rows": None,
+        f"Only {target_value}s": outputs == target_value,
+        "Only Xs": outputs == -1,
+    }
+    
+    c1, c2 = st.columns(2)
+    with c1:
+        row_filter = st.selectbox("Show", list(filters), key="tt_filter")
+    
+    selected = filters[row_filter]
+    rows = np.arange(outputs.size) if selected is None else np.flatnonzero(selected)
+    num_pages = max(1, -(-rows.size // TABLE_PAGE_SIZE))
+    
+    def jump_to_minterm():
+        # Move the page selector to the page holding the requested minterm
+        target = st.session_state.tt_jump
+        if target is None:
+            return
+        pos = int(np.searchsorted(rows, target))
+        st.session_state.tt_page = min(pos // TABLE_PAGE_SIZE, num_pages - 1) + 1
+    
+    with c2:
+        st.number_input("Jump to minterm", min_value=0, max_value=outputs.size - 1, value=None,
+                        step=1, key="tt_jump", on_change=jump_to_minterm)
+    
+    if st.session_state.get("tt_page", 1) > num_pages:
+        st.session_state.tt_page = 1
+    page = st.number_input(f"Page (of {num_pages})", min_value=1, max_value=num_pages, step=1, key="tt_page")
+    
+    window = rows[(page - 1) * TABLE_PAGE_SIZE:page * TABLE_PAGE_SIZE]
+    table = solver.truth_table_rows(window, outputs)
+    st.dataframe(
+        table.style.map(highlight_output, subset=['Output']),
+        use_container_width=True,
+        hide_index=True,
+        height=min(500, 38 + 35 * len(table))
+    )
+    st.caption(f"{rows.size} of {outputs.size} rows")
+
+def read_typed_terms(num_vars, mode_short, minterm_label):
+    # Comma-separated term inputs; returns (inputs_key, minterms, dont_cares)
+    def parse_input(input_str):
+        if not input_str.strip():
+            return []
+        try:
+            return [int(x.strip()) for x in input_str.split(',') if x.strip().isdigit()]
+        except:
+            return []
+    
+    minterms_input = st.sidebar.text_input(f"Enter {minterm_label}", "0, 1, 5, 7, 8, 9, 13, 15", 
+                                           help="Comma-separated numbers")
+    dont_cares_input = st.sidebar.text_input("Don't Cares (Optional)", "3, 11",
+                                             help="Terms that can be either 0 or 1")
+    
+    minterms = parse_input(minterms_input)
+    dont_cares = parse_input(dont_cares_input)
+    
+    # Validation
+    max_val = 2**num_vars - 1
+    valid_minterms = [m for m in minterms if 0 <= m <= max_val]
+    valid_dont_cares = [d for d in dont_cares if 0 <= d <= max_val]
+    
+    # Check for overlap
+    overlap = set(valid_minterms) & set(valid_dont_cares)
+    if overlap:
+        st.sidebar.error(f"⚠️ Terms {overlap} cannot be both {minterm_label} and Don't Care!")
+        st.stop()
+    
+    inputs_key = (num_vars, mode_short, tuple(sorted(set(valid_minterms))), tuple(sorted(set(valid_dont_cares))))
+    return inputs_key, valid_minterms, valid_dont_cares
+
+@st.cache_data(max_entries=8, show_spinner="Reading file...")
+def load_uploaded(data, name):
+    return load_function(data, name)
+
+def describe_terms(terms):
+    terms = list(terms)
+    return str(terms) if len(terms) <= MAX_LISTED_TERMS else f"{len(terms)} terms"
+
+def trace_engine(solver):
+    # Prime implicant engine for the traced solve, picked by the backend
+    # cost model among the engines trace() can stream
+    density = (len(solver.target_terms) + len(solver.dont_cares)) / 2**solver.num_vars
+    # The page never uses the shared worker pool: its spawned workers would
+    # re-import this script, which Streamlit runs as __main__
+    backend = select_backend(solver.num_vars, density, SOLVE_BUDGET)
+    return backend if backend in PI_ENGINES and backend != 'parallel' else 'numpy'
+
 # Solver Page
 def show_solver():
     # Logo (Smaller)
@@ -376,7 +542,10 @@ def show_solver():
     
     st.sidebar.title("🎛️ Configuration")
     
-    num_vars = st.sidebar.radio("Number of Variables", [2, 3, 4], index=2)
+    input_source = st.sidebar.radio("Input", ["Terms", "Truth Table / PLA File"], horizontal=True)
+    from_file = input_source != "Terms"
+    if not from_file:
+        num_vars = st.sidebar.radio("Number of Variables", [2, 3, 4], index=2)
     mode = st.sidebar.radio("Mode", ["SOP (Sum of Products)", "POS (Product of Sums)"], index=0)
     mode_short = "SOP" if "SOP" in mode else "POS"
     
@@ -404,45 +573,71 @@ def show_solver():
     
     st.sidebar.markdown("---")
     st.sidebar.subheader("Input Terms")
-    
-    # Helper to parse input
-    def parse_input(input_str):
-        if not input_str.strip():
-            return []
-        try:
-            return [int(x.strip()) for x in input_str.split(',') if x.strip().isdigit()]
-        except:
-            return []
-    
     minterm_label = "Minterms (1s)" if mode_short == "SOP" else "Maxterms (0s)"
-    minterms_input = st.sidebar.text_input(f"Enter {minterm_label}", "0, 1, 5, 7, 8, 9, 13, 15", 
-                                           help="Comma-separated numbers")
-    dont_cares_input = st.sidebar.text_input("Don't Cares (Optional)", "3, 11",
-                                             help="Terms that can be either 0 or 1")
     
-    minterms = parse_input(minterms_input)
-    dont_cares = parse_input(dont_cares_input)
-    
-    # Validation
-    max_val = 2**num_vars - 1
-    valid_minterms = [m for m in minterms if 0 <= m <= max_val]
-    valid_dont_cares = [d for d in dont_cares if 0 <= d <= max_val]
-    
-    # Check for overlap
-    overlap = set(valid_minterms) & set(valid_dont_cares)
-    if overlap:
-        st.sidebar.error(f"⚠️ Terms {overlap} cannot be both {minterm_label} and Don't Care!")
-        st.stop()
+    if from_file:
+        uploaded = st.sidebar.file_uploader(
+            "Truth table (.csv) or PLA (.pla)", type=["csv", "pla"],
+            help="CSV: one 0/1 column per input and an Output column of 0, 1 or X. "
+                 "PLA: espresso format, first output.")
+        if uploaded is None:
+            st.info("👈 Upload a truth table or PLA file in the sidebar")
+            render_sidebar_footer(show_back=True)
+            return
+        try:
+            num_vars, file_outputs = load_uploaded(uploaded.getvalue(), uploaded.name)
+        except ValueError as e:
+            st.sidebar.error(f"⚠️ Could not read {uploaded.name}: {e}")
+            st.stop()
+        if num_vars > MAX_SOLVE_VARS:
+            st.sidebar.error(f"⚠️ {uploaded.name} has {num_vars} variables; the solver page handles up to "
+                             f"{MAX_SOLVE_VARS}. Use batch.py or service.py for wider functions.")
+            st.stop()
+        st.sidebar.caption(f"{num_vars} variables, {int((file_outputs == 1).sum())} ones, "
+                           f"{int((file_outputs == -1).sum())} don't cares")
+        inputs_key = (num_vars, mode_short, 'file', uploaded.file_id)
+    else:
+        inputs_key, valid_minterms, valid_dont_cares = read_typed_terms(num_vars, mode_short, minterm_label)
     
     # Go Button
-    if st.sidebar.button("🚀 SOLVE & ANIMATE"):
-        # Solve
-        solver = KMapSolver(num_vars, valid_minterms, valid_dont_cares, mode=mode_short)
-        truth_table = solver.get_truth_table()
-        equation, logic_parts, groups = solver.solve()
+    solve_clicked = st.sidebar.button("🚀 SOLVE & ANIMATE")
+    if solve_clicked:
+        if from_file:
+            solver = solver_from_outputs(file_outputs, mode_short)
+            outputs = file_outputs
+        else:
+            solver = KMapSolver(num_vars, valid_minterms, valid_dont_cares, mode=mode_short)
+            outputs = solver.get_output_array()
+        st.session_state.solution = {
+            'key': inputs_key,
+            'solver': solver,
+            'outputs': outputs,
+            # Filled in while the solve is streamed below
+            'events': None,
+            'alternatives': None,
+            'proven_minimal': True,
+        }
+        st.session_state.solution_choice = 0
+        st.session_state.tt_page = 1
+    
+    solution = st.session_state.get('solution')
+    if solution is not None and solution['key'] == inputs_key:
+        if not solve_clicked:
+            # Rerun from another widget (e.g. picking a different cover): skip the animation
+            speed_mode = "Instant"
+            step_delay = 0
+            value_delay = 0
+            phase_delay = 0
         
-        visualizer = KMapVisualizer(num_vars, valid_minterms, valid_dont_cares, groups, 
-                                     st.session_state.theme)
+        solver = solution['solver']
+        all_values = list(range(2**num_vars))
+        # The K-map itself is drawn for 2-4 variables; wider functions get the
+        # equation, log and truth table only
+        visualizer = None
+        if 2 <= num_vars <= 4:
+            visualizer = KMapVisualizer(num_vars, sorted(solver.minterms), sorted(solver.dont_cares), [],
+                                         st.session_state.theme)
+        animate = speed_mode != "Instant" and visualizer is not None
     
     
         # Layout: K-Map (Left, Large) | Tabs (Right, Info)
@@ -450,9 +645,13 @@ def show_solver():
         
         with col_kmap:
             st.subheader("📊 K-Map Visualization")
-            # Equation Display
-            st.markdown(f'<div class="equation-text">F = {equation}</div>', unsafe_allow_html=True)
+            # Equation Display (filled in once the solve finishes)
+            equation_placeholder = st.empty()
+            caption_placeholder = st.empty()
             plot_placeholder = st.empty()
+            if visualizer is None:
+                plot_placeholder.info(f"The K-map is drawn for 2 to 4 variables, this function has {num_vars}. "
+                                      "The equation, solution log and truth table cover it in full.")
             
         with col_info:
             st.subheader("ℹ️ Details")
@@ -466,20 +665,7 @@ def show_solver():
                 js_placeholder = st.empty()
                 
             with tab_table:
-                def highlight_output(val):
-                    if val == 1:
-                        return 'color: #00FF00; font-weight: bold'
-                    elif val == 0:
-                        return 'color: #FF5733'
-                    elif val == 'X':
-                        return 'color: #FF00FF; font-weight: bold'
-                    return ''
-
-                st.dataframe(
-                    truth_table.style.applymap(highlight_output, subset=['Output']),
-                    use_container_width=True,
-                    height=500
-                )
+                render_truth_table(solver, solution['outputs'], mode_short)
 
         # Log State
         logs = []
@@ -508,20 +694,30 @@ def show_solver():
                 unsafe_allow_html=True
             )
         
+        frames_rendered = [0]
+        
+        def show_frame(**kwargs):
+            if visualizer is None:
+                return
+            with METRICS.timer('logicmap_render_seconds'):
+                fig = visualizer.draw(**kwargs)
+                plot_placeholder.pyplot(fig, use_container_width=True)
+                plt.close(fig)
+            frames_rendered[0] += 1
+        
+        def show_groups(visible_groups):
+            show_frame(show_grid=True, show_indices=True, visible_values=all_values, visible_groups=visible_groups)
+        
         # --- Phase 1: Setup & Plotting ---
-        if speed_mode != "Instant":
+        if animate:
             # 1. Construct Grid
             add_log("<b>Phase 1:</b> Constructing Grid (Gray Code)", "🏗️")
-            fig = visualizer.draw(show_grid=True, show_indices=False, visible_values=None, visible_groups=None)
-            plot_placeholder.pyplot(fig, use_container_width=True)
-            plt.close(fig)
+            show_frame(show_grid=True, show_indices=False, visible_values=None, visible_groups=None)
             time.sleep(step_delay)
             
             # 2. Show Indices
             add_log("<b>Phase 1:</b> Marking Cell Indices", "🔢")
-            fig = visualizer.draw(show_grid=True, show_indices=True, visible_values=None, visible_groups=None)
-            plot_placeholder.pyplot(fig, use_container_width=True)
-            plt.close(fig)
+            show_frame(show_grid=True, show_indices=True, visible_values=None, visible_groups=None)
             time.sleep(step_delay)
             
             # 3. Plot Terms
@@ -530,63 +726,105 @@ def show_solver():
             for i in range(2**num_vars):
                 visible_vals.append(i)
                 if speed_mode == "Educational (Slow)" or i % 2 == 0 or i == 2**num_vars - 1:
-                    fig = visualizer.draw(show_grid=True, show_indices=True, visible_values=visible_vals, visible_groups=None)
-                    plot_placeholder.pyplot(fig, use_container_width=True)
-                    plt.close(fig)
+                    show_frame(show_grid=True, show_indices=True, visible_values=visible_vals, visible_groups=None)
                     time.sleep(value_delay)
             time.sleep(phase_delay)
         
-        # --- Phase 2: Grouping Strategy ---
-        add_log("<b>Phase 2:</b> Grouping Strategy (Greedy Search)", "🧠")
+        # --- Phase 2: Solve, logged from the solver's own trace ---
+        add_log("<b>Phase 2:</b> Quine-McCluskey (Combine, Essentials, Cover)", "🧠")
         
-        if not groups:
-            add_log("No Groups Found", "❌")
-            time.sleep(step_delay)
+        live = solution['events'] is None
+        METRICS.cache('solution', hit=not live)
+        if live:
+            engine = trace_engine(solver)
+            events = METRICS.timed_iter(solver.trace(engine, deadline=SOLVE_BUDGET),
+                                        'logicmap_solve_seconds', num_vars=num_vars)
         else:
-            visible_groups = []
-            for i, group in enumerate(groups):
-                visible_groups.append(group)
-                group_size = len(group)
-                
-                # Determine group type text
-                if group_size == 16: g_type = "16 (All)"
-                elif group_size == 8: g_type = "Octet (8)"
-                elif group_size == 4: g_type = "Quad (4)"
-                elif group_size == 2: g_type = "Pair (2)"
-                else: g_type = "Single (1)"
-                
-                add_log(f"Found <b>{g_type}</b> - Group {i+1}", "🔍")
-                
-                if speed_mode != "Instant":
-                    fig = visualizer.draw(show_grid=True, show_indices=True, visible_values=list(range(2**num_vars)), visible_groups=visible_groups)
-                    plot_placeholder.pyplot(fig, use_container_width=True)
-                    plt.close(fig)
+            events = solution['events']
+        recorded = []
+        chosen = []
+        primes_logged = 0
+        for event in events:
+            kind = event['event']
+            if kind == 'prime':
+                primes_logged += 1
+            # Only what the log shows is kept for replays: merges are summed
+            # up by their combine_round, and primes past the logged ones dropped
+            if kind == 'merge' or (kind == 'prime' and primes_logged > MAX_LOGGED_PRIMES):
+                continue
+            recorded.append(event)
+            if kind == 'prime':
+                add_log(f"Prime implicant <b>{event['term']}</b> covers {describe_terms(event['cube'])}", "⭐")
+            elif kind == 'combine_round':
+                add_log(f"Round {event['round']}: merged {event['merges']} pairs into "
+                        f"{event['implicants']} implicants, {event['primes']} prime", "🔗")
+            elif kind in ('essential', 'greedy_pick'):
+                chosen.append(event['cube'])
+                label = "Essential" if kind == 'essential' else "Greedy pick"
+                add_log(f"{label}: <b>{event['term']}</b> covers {describe_terms(event['covers'])}", "🔍")
+                if animate:
+                    show_groups(chosen)
                     time.sleep(step_delay * 1.5)
-            time.sleep(phase_delay)
+            elif kind == 'refine':
+                chosen = list(event['cover'])
+                add_log(f"Exact search found a cheaper cover: <b>{event['terms']}</b> terms", "🎯")
+                if animate:
+                    show_groups(chosen)
+                    time.sleep(step_delay * 1.5)
+            elif kind == 'result':
+                if not event['groups']:
+                    add_log("No Groups Found", "❌")
+                    time.sleep(step_delay)
+                if live:
+                    result = (event['equation'], event['logic_parts'], event['groups'])
+                    alternatives = [result]
+                    if event['proven_minimal']:
+                        # Other covers of the same cost, offered in the selector
+                        for alt in solver.iter_minimal_covers(limit=MAX_ALTERNATIVES, deadline=ALTERNATIVES_BUDGET,
+                                                              engine=engine):
+                            if set(alt[1]) != set(result[1]) and len(alternatives) < MAX_ALTERNATIVES:
+                                alternatives.append(alt)
+                    solution['alternatives'] = alternatives
+                    solution['proven_minimal'] = event['proven_minimal']
+        if live:
+            solution['events'] = recorded
+        time.sleep(phase_delay)
+        
+        alternatives = solution['alternatives']
+        choice = 0
+        if len(alternatives) > 1:
+            choice = st.sidebar.selectbox(
+                f"Minimal Solutions ({len(alternatives)})",
+                list(range(len(alternatives))),
+                format_func=lambda i: f"F = {alternatives[i][0]}",
+                key="solution_choice"
+            )
+        equation, logic_parts, groups = alternatives[choice]
+        
+        equation_placeholder.markdown(f'<div class="equation-text">F = {equation}</div>', unsafe_allow_html=True)
+        if not solution['proven_minimal']:
+            caption_placeholder.caption("⏱️ Best cover found within the time budget (not proven minimal)")
         
         # --- Phase 3: Extraction (Detailed) ---
         add_log("<b>Phase 3:</b> Term Extraction", "🧪")
         
         colors = ['#FFD700', '#FF69B4', '#00FFFF', '#ADFF2F', '#FF4500', '#9370DB']
         
-        if speed_mode != "Instant":
+        if animate:
             for i, group in enumerate(groups):
                 term = logic_parts[i]
                 color = colors[i % len(colors)]
                 
                 # Highlight specific group
-                fig = visualizer.draw(show_grid=True, show_indices=True, visible_values=list(range(2**num_vars)), visible_groups=[group])
-                plot_placeholder.pyplot(fig, use_container_width=True)
-                plt.close(fig)
+                show_groups([group])
                 
-                add_log(f"Group {i+1} (<span style='color:{color}'>■</span>) covers {list(group)} <br>→ Term: <b>{term}</b>", "📝")
+                add_log(f"Group {i+1} (<span style='color:{color}'>■</span>) covers {describe_terms(group)} <br>→ Term: <b>{term}</b>", "📝")
                 time.sleep(step_delay * 2)
         
         # Final State
         add_log(f"<b>Final Equation:</b> F = {equation}", "✅")
-        fig = visualizer.draw(show_grid=True, show_indices=True, visible_values=list(range(2**num_vars)), visible_groups=groups)
-        plot_placeholder.pyplot(fig, use_container_width=True)
-        plt.close(fig)
+        show_groups(groups)
+        METRICS.observe('logicmap_animation_frames', frames_rendered[0])
     
     else:
         st.info("👈 Configure your inputs in the sidebar and click **SOLVE & ANIMATE**")
@@ -0,0 +1,169 @@
+import argparse
+import math
+import random
+import statistics
+import time
+
+from kmap_logic import KMapSolver, in_worker_process
+
+# Solver backends behind KMapSolver.solve(backend=...). Each backend declares
+# what it can do:
+#   exact         - can prove a cover minimum when given a deadline
+#   multi_output  - minimizes several outputs jointly (none do yet)
+#   max_vars      - widest function it accepts (None = no limit)
+#   uses_pool     - runs on the shared worker pool, so 'auto' skips it
+#                   inside a worker process (service, batch)
+# backend='auto' picks the cheapest capable backend from CALIBRATION, measured
+# times (ms) of a plain solve on random functions by variable count and
+# density of on-set + don't cares. Rerun `python backends.py` on the target
+# machine to refresh the table. Past the widest calibrated size 'auto'
+# does not extrapolate: it takes 'numpy' where that applies.
+
+
+def _qm(engine):
+    return lambda solver, deadline: solver.solve(engine=engine, deadline=deadline)
+
+
+def _decomposed(solver, deadline):
+    from decompose import solve_decomposed
+    return solve_decomposed(solver, engine='numpy', deadline=deadline)
+
+
+def _bdd(solver, deadline):
+    from bdd import solve_bdd
+    return solve_bdd(solver)
+
+
+BACKENDS = {}
+
+
+def register_backend(name, solve, exact, max_vars=None, multi_output=False, uses_pool=False):
+    # solve(solver, deadline) must return solve()'s (equation, logic_parts,
+    # groups) and set solver.proven_minimal
+    BACKENDS[name] = {'solve': solve, 'exact': exact, 'max_vars': max_vars, 'multi_output': multi_output,
+                      'uses_pool': uses_pool}
+
+
+register_backend('python', _qm('python'), exact=True)
+register_backend('numpy', _qm('numpy'), exact=True, max_vars=31)
+register_backend('parallel', _qm('parallel'), exact=True, max_vars=31, uses_pool=True)
+register_backend('decompose', _decomposed, exact=True, max_vars=31)
+register_backend('bdd', _bdd, exact=False)
+
+DENSITIES = (0.1, 0.4, 0.7)
+
+# {backend: {num_vars: (ms at each of DENSITIES)}}, from `python backends.py`
+# on a single core (which is why 'parallel' only pays off at the top end);
+# 'parallel' timed with the shared worker pool already running
+CALIBRATION = {
+    'python': {4: (0.1, 0.1, 0.1), 6: (0.1, 0.2, 0.7), 8: (0.2, 1.1, 5.7), 10: (0.8, 17.8, 262.4), 12: (7.3, 390.5, 6379.3)},
+    'numpy': {4: (0.2, 0.2, 0.3), 6: (0.2, 0.5, 0.7), 8: (0.4, 1.1, 4.5), 10: (1.7, 10.4, 42.9), 12: (4.0, 177.0, 1011.2)},
+    'parallel': {4: (4.4, 4.0, 4.5), 6: (3.7, 5.7, 7.9), 8: (4.7, 9.8, 15.1), 10: (7.9, 25.5, 87.4), 12: (14.7, 257.7, 1184.7)},
+    'decompose': {4: (0.2, 0.3, 0.4), 6: (0.3, 0.6, 1.1), 8: (0.6, 1.7, 3.9), 10: (2.1, 33.5, 104.4), 12: (6.7, 826.7, 3949.6)},
+    'bdd': {4: (0.3, 0.3, 0.4), 6: (0.6, 3.3, 3.2), 8: (4.5, 24.6, 33.5), 10: (56.9, 371.3, 399.9), 12: (759.5, 4753.6, 6089.0)},
+}
+
+
+def estimate_cost(name, num_vars, density):
+    # Predicted seconds for a plain solve: nearest calibrated density, log-
+    # linear interpolation in num_vars, extrapolated past the table's ends
+    table = CALIBRATION.get(name)
+    if not table:
+        return math.inf
+    column = min(range(len(DENSITIES)), key=lambda i: abs(DENSITIES[i] - density))
+    sizes = sorted(table)
+    if num_vars <= sizes[0]:
+        return max(table[sizes[0]][column], 0.01) / 1000
+    lo = max(s for s in sizes if s <= num_vars)
+    hi = min([s for s in sizes if s > lo] or [lo])
+    if hi == lo:
+        lo, hi = sizes[-2], sizes[-1]
+    t_lo = max(table[lo][column], 0.01)
+    t_hi = max(table[hi][column], 0.01)
+    slope = (math.log(t_hi) - math.log(t_lo)) / (hi - lo)
+    return math.exp(math.log(t_lo) + slope * (num_vars - lo)) / 1000
+
+
+def capable_backends(num_vars, exact=False, multi_output=False):
+    in_worker = in_worker_process()
+    return [name for name, caps in BACKENDS.items()
+            if (caps['max_vars'] is None or num_vars <= caps['max_vars'])
+            and (caps['exact'] or not exact)
+            and (caps['multi_output'] or not multi_output)
+            and not (caps['uses_pool'] and in_worker)]
+
+
+def select_backend(num_vars, density, budget=None, exact=False):
+    # Cheapest capable backend. With a budget, a heuristic backend that fits
+    # it wins over an exact one predicted to overrun it.
+    candidates = capable_backends(num_vars, exact)
+    if not candidates:
+        raise ValueError(f"No solver backend handles {num_vars} variables")
+    if num_vars > max(max(table) for table in CALIBRATION.values()) and 'numpy' in candidates:
+        return 'numpy'
+    costs = {name: estimate_cost(name, num_vars, density) for name in candidates}
+    best = min(candidates, key=costs.get)
+    if budget is not None and costs[best] > budget:
+        within = [name for name in capable_backends(num_vars) if estimate_cost(name, num_vars, density) <= budget]
+        if within:
+            best = min(within, key=lambda name: estimate_cost(name, num_vars, density))
+    return best
+
+
+def solve_with_backend(solver, backend='auto', deadline=None):
+    # Runs solver through the named backend (or the selected one for 'auto')
+    # and records the choice in solver.backend
+    if backend == 'auto':
+        density = (len(solver.target_terms) + len(solver.dont_cares)) / 2**solver.num_vars
+        backend = select_backend(solver.num_vars, density, deadline)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected 'auto' or one of {sorted(BACKENDS)}")
+    caps = BACKENDS[backend]
+    if caps['max_vars'] is not None and solver.num_vars > caps['max_vars']:
+        raise ValueError(f"Backend '{backend}' supports at most {caps['max_vars']} variables")
+    result = caps['solve'](solver, deadline)
+    solver.backend = backend
+    return result
+
+
+def calibrate(names=None, sizes=(4, 6, 8, 10, 12), samples=3, seed=0):
+    # Median solve time (ms) per backend, variable count and density, in the
+    # CALIBRATION layout
+    rng = random.Random(seed)
+    table = {}
+    for name in names or BACKENDS:
+        table[name] = {}
+        for num_vars in sizes:
+            row = []
+            for density in DENSITIES:
+                times = []
+                while len(times) < samples:
+                    terms = [t for t in range(2**num_vars) if rng.random() < density]
+                    split = int(len(terms) * 0.8)
+                    solver = KMapSolver(num_vars, terms[:split], terms[split:])
+                    if solver._trivial_cover() is not None:
+                        continue
+                    start = time.perf_counter()
+                    BACKENDS[name]['solve'](solver, None)
+                    times.append((time.perf_counter() - start) * 1000)
+                row.append(round(statistics.median(times), 1))
+            table[name][num_vars] = tuple(row)
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the solver backends to refresh CALIBRATION.")
+    parser.add_argument("--backends", nargs="*", default=None)
+    parser.add_argument("--max-vars", type=int, default=12)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    table = calibrate(args.backends, range(4, args.max_vars + 1, 2), args.samples)
+    print("CALIBRATION = {")
+    for name, rows in table.items():
+        print(f"    {name!r}: {rows},")
+    print("}")
+
+
+if __name__ == "__main__":
+    main()
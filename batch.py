@@ -0,0 +1,258 @@
+import argparse
+import json
+import os
+import socket
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from kmap_logic import KMapSolver
+
+# Sharded, resumable batch minimization. A corpus is a JSON-lines file of
+# problems ({"num_vars", "minterms", "dont_cares", "mode", "name"}), split
+# into fixed-size shards of consecutive lines, so the same corpus and shard
+# size always give the same shards. Workers - local processes or processes
+# on other machines sharing the work directory - coordinate only through files:
+#
+#   work_dir/plan.json          corpus, shard size, shard count and the byte
+#                               offset where each shard starts
+#   work_dir/shards/NNNNN.lock  claim on a shard, refreshed while it is solved
+#   work_dir/shards/NNNNN.jsonl results of a finished shard
+#
+# Every file is created atomically (O_EXCL or write-then-rename), so a crashed
+# worker leaves at most a stale lock, which others take over once it is older
+# than LEASE_SECONDS. Rerunning resumes: finished shards are skipped.
+
+SHARD_SIZE = 1000
+LEASE_SECONDS = 300.0  # a lock not refreshed for this long is considered abandoned
+HEARTBEAT_EVERY = 100  # problems between lock refreshes
+
+
+def _shard_path(work_dir, shard, suffix):
+    return os.path.join(work_dir, "shards", f"{shard:05d}.{suffix}")
+
+
+def _write_atomic(path, text):
+    tmp = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def plan_shards(corpus, work_dir, shard_size=SHARD_SIZE):
+    # Creates work_dir/plan.json, or checks an existing one matches. Safe to
+    # call from many workers at once: exactly one plan is ever written.
+    os.makedirs(os.path.join(work_dir, "shards"), exist_ok=True)
+    path = os.path.join(work_dir, "plan.json")
+    if not os.path.exists(path):
+        # One pass over the corpus; workers then seek straight to their shard
+        num_items, position, offsets = 0, 0, []
+        with open(corpus, "rb") as f:
+            for line in f:
+                if line.strip():
+                    if num_items % shard_size == 0:
+                        offsets.append(position)
+                    num_items += 1
+                position += len(line)
+        plan = {'corpus': os.path.abspath(corpus), 'corpus_bytes': os.path.getsize(corpus),
+                'num_items': num_items, 'shard_size': shard_size,
+                'num_shards': len(offsets), 'offsets': offsets}
+        tmp = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(plan, f)
+        try:
+            os.link(tmp, path)  # fails if another worker got there first
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp)
+    with open(path) as f:
+        plan = json.load(f)
+    if plan['shard_size'] != shard_size or plan['corpus_bytes'] != os.path.getsize(corpus):
+        raise ValueError(f"{work_dir} holds a plan for a different corpus or shard size; use a new work directory")
+    return plan
+
+
+def _claim(work_dir, shard, worker_id):
+    # True if this worker now holds the shard's lock
+    lock = _shard_path(work_dir, shard, "lock")
+    for _ in range(2):
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                stale = time.time() - os.path.getmtime(lock) > LEASE_SECONDS
+            except FileNotFoundError:
+                continue  # released meanwhile, try again
+            if not stale:
+                return False
+            # Only one worker wins the rename, the others see the file gone.
+            # A late loser can still move the winner's fresh lock aside; then
+            # both solve the shard, which costs time but not correctness,
+            # since results are identical and replaced atomically.
+            try:
+                os.rename(lock, f"{lock}.stale.{worker_id}")
+                os.remove(f"{lock}.stale.{worker_id}")
+            except FileNotFoundError:
+                return False
+            continue
+        with os.fdopen(fd, "w") as f:
+            f.write(f"{worker_id} {time.time()}\n")
+        return True
+    return False
+
+
+def _iter_shard(plan, shard):
+    # (index, raw line) pairs; lines are parsed per record by solve_problem
+    index, stop = shard * plan['shard_size'], min((shard + 1) * plan['shard_size'], plan['num_items'])
+    with open(plan['corpus'], "rb") as f:
+        f.seek(plan['offsets'][shard])
+        for line in f:
+            if index >= stop:
+                break
+            if line.strip():
+                yield index, line
+                index += 1
+
+
+def solve_problem(index, problem, engine='python', deadline=None, backend=None):
+    # One result record; a bad problem (or a corpus line that is not a JSON
+    # object) is reported, not fatal to the shard
+    record = {'index': index, 'name': None}
+    try:
+        if isinstance(problem, (bytes, str)):
+            problem = json.loads(problem)
+        if not isinstance(problem, dict):
+            raise TypeError("problem must be a JSON object")
+        record['name'] = problem.get('name')
+        solver = KMapSolver(problem['num_vars'], problem.get('minterms', []),
+                            problem.get('dont_cares', []), problem.get('mode', 'SOP'))
+        equation, logic_parts, groups = solver.solve(engine=engine, deadline=deadline, backend=backend)
+    except (KeyError, TypeError, ValueError) as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+        return record
+    record.update(equation=equation, terms=logic_parts, cubes=[g.to_bin() for g in groups],
+                  proven_minimal=solver.proven_minimal)
+    return record
+
+
+def run_worker(corpus, work_dir, shard_size=SHARD_SIZE, worker_id=None, engine='python',
+               deadline=None, backend=None, max_shards=None):
+    # Claims and solves unfinished shards until none are left (or max_shards
+    # are done). Returns the list of shards this worker finished.
+    plan = plan_shards(corpus, work_dir, shard_size)
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    # Start at a worker-specific offset so workers rarely race for one lock
+    num_shards = plan['num_shards']
+    offset = zlib.crc32(worker_id.encode()) % num_shards if num_shards else 0
+    finished = []
+    for step in range(num_shards):
+        if max_shards is not None and len(finished) >= max_shards:
+            break
+        shard = (offset + step) % num_shards
+        result = _shard_path(work_dir, shard, "jsonl")
+        if os.path.exists(result) or not _claim(work_dir, shard, worker_id):
+            continue
+        lock = _shard_path(work_dir, shard, "lock")
+        try:
+            if os.path.exists(result):  # finished by someone else just before our claim
+                continue
+            lines = []
+            for n, (index, problem) in enumerate(_iter_shard(plan, shard)):
+                lines.append(json.dumps(solve_problem(index, problem, engine, deadline, backend)))
+                if n % HEARTBEAT_EVERY == HEARTBEAT_EVERY - 1:
+                    os.utime(lock)
+            _write_atomic(result, "".join(line + "\n" for line in lines))
+            finished.append(shard)
+        finally:
+            try:
+                os.remove(lock)
+            except FileNotFoundError:
+                pass
+    return finished
+
+
+def _worker_main(args):
+    return run_worker(*args)
+
+
+def run_batch(corpus, work_dir, workers=None, shard_size=SHARD_SIZE, engine='python',
+              deadline=None, backend=None):
+    # Runs `workers` local worker processes to completion; other machines can
+    # run run_worker() (or `batch.py run`) on the same work_dir meanwhile
+    plan_shards(corpus, work_dir, shard_size)
+    workers = workers or os.cpu_count() or 1
+    host = socket.gethostname()
+    jobs = [(corpus, work_dir, shard_size, f"{host}-{os.getpid()}-{i}", engine, deadline, backend)
+            for i in range(workers)]
+    if workers == 1:
+        return sorted(_worker_main(jobs[0]))
+    # Unlike multiprocessing.Pool's daemonic workers, executor workers may
+    # start processes of their own
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return sorted(s for done in pool.map(_worker_main, jobs) for s in done)
+
+
+def shard_status(work_dir):
+    with open(os.path.join(work_dir, "plan.json")) as f:
+        plan = json.load(f)
+    done = [s for s in range(plan['num_shards']) if os.path.exists(_shard_path(work_dir, s, "jsonl"))]
+    locked = [s for s in range(plan['num_shards']) if os.path.exists(_shard_path(work_dir, s, "lock"))]
+    return {'num_shards': plan['num_shards'], 'done': len(done), 'in_progress': locked,
+            'missing': sorted(set(range(plan['num_shards'])) - set(done))}
+
+
+def merge_shards(work_dir, out_path):
+    # Concatenates shard results in corpus order, once every shard is done
+    status = shard_status(work_dir)
+    if status['missing']:
+        raise ValueError(f"{len(status['missing'])} shards are not finished yet, e.g. {status['missing'][:5]}")
+    count = 0
+    tmp = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as out:
+        for shard in range(status['num_shards']):
+            with open(_shard_path(work_dir, shard, "jsonl")) as f:
+                for line in f:
+                    out.write(line)
+                    count += 1
+    os.replace(tmp, out_path)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sharded, resumable batch K-map minimization.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="solve unfinished shards (rerun to resume)")
+    run.add_argument("corpus", help="JSON-lines file of problems")
+    run.add_argument("--work-dir", required=True, help="shared directory for the plan, locks and results")
+    run.add_argument("--workers", type=int, default=None, help="local worker processes (default: CPU count)")
+    run.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    run.add_argument("--engine", default='python')
+    run.add_argument("--backend", default=None)
+    run.add_argument("--deadline", type=float, default=None, help="per-problem refinement budget, seconds")
+    status = sub.add_parser("status", help="show shard progress")
+    status.add_argument("--work-dir", required=True)
+    merge = sub.add_parser("merge", help="merge finished shards into one JSON-lines file")
+    merge.add_argument("--work-dir", required=True)
+    merge.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        start = time.perf_counter()
+        finished = run_batch(args.corpus, args.work_dir, args.workers, args.shard_size,
+                             args.engine, args.deadline, args.backend)
+        state = shard_status(args.work_dir)
+        print(f"Finished {len(finished)} shards in {time.perf_counter() - start:.2f}s; "
+              f"{state['done']}/{state['num_shards']} done overall")
+    elif args.command == "status":
+        state = shard_status(args.work_dir)
+        print(f"{state['done']}/{state['num_shards']} shards done, {len(state['in_progress'])} in progress")
+    else:
+        count = merge_shards(args.work_dir, args.out)
+        print(f"Merged {count} results into {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+from kmap_logic import KMapSolver, Cube
+from verify import parse_expression
+
+# Reduced ordered binary decision diagrams. Functions are node ids in a shared
+# BDD manager, so wide functions with compact structure (40+ inputs) can be
+# built, counted and covered without enumerating 2^n minterms.
+#
+# Variables are numbered like KMapSolver's (0 = A, the MSB of a minterm) and
+# cubes use the same (value, mask) encoding as Cube. The variable order (which
+# variable is tested at which level) is separate from the numbering and can be
+# changed with reorder() / sift().
+
+FALSE, TRUE = 0, 1
+
+
+class BDD:
+    def __init__(self, num_vars, order=None):
+        self.num_vars = num_vars
+        self.order = list(order) if order is not None else list(range(num_vars))
+        if sorted(self.order) != list(range(num_vars)):
+            raise ValueError(f"Order must be a permutation of 0..{num_vars - 1}")
+        self.level = {v: i for i, v in enumerate(self.order)}
+        # Node table: parallel lists indexed by node id. The two terminals sit
+        # below every variable level.
+        self.var = [num_vars, num_vars]
+        self.low = [FALSE, TRUE]
+        self.high = [FALSE, TRUE]
+        self.unique = {}    # (var, low, high) -> node id
+        self.computed = {}  # (op, operands...) -> node id
+
+    # --- construction ---
+
+    def _level(self, u):
+        return self.num_vars if u <= TRUE else self.level[self.var[u]]
+
+    def _mk(self, var, low, high):
+        if low == high:
+            return low
+        key = (var, low, high)
+        u = self.unique.get(key)
+        if u is None:
+            u = len(self.var)
+            self.var.append(var)
+            self.low.append(low)
+            self.high.append(high)
+            self.unique[key] = u
+        return u
+
+    def variable(self, i, positive=True):
+        if not 0 <= i < self.num_vars:
+            raise ValueError(f"Variable must be between 0 and {self.num_vars - 1}")
+        return self._mk(i, FALSE, TRUE) if positive else self._mk(i, TRUE, FALSE)
+
+    def _cofactors(self, u, level):
+        if self._level(u) == level:
+            return self.low[u], self.high[u]
+        return u, u
+
+    def ite(self, f, g, h):
+        # if f then g else h, the one operator everything else is built from
+        if f == TRUE:
+            return g
+        if f == FALSE:
+            return h
+        if g == h:
+            return g
+        if g == TRUE and h == FALSE:
+            return f
+        key = ('ite', f, g, h)
+        result = self.computed.get(key)
+        if result is not None:
+            return result
+        level = min(self._level(f), self._level(g), self._level(h))
+        f0, f1 = self._cofactors(f, level)
+        g0, g1 = self._cofactors(g, level)
+        h0, h1 = self._cofactors(h, level)
+        result = self._mk(self.order[level], self.ite(f0, g0, h0), self.ite(f1, g1, h1))
+        self.computed[key] = result
+        return result
+
+    def not_(self, f):
+        return self.ite(f, FALSE, TRUE)
+
+    def and_(self, f, g):
+        return self.ite(f, g, FALSE)
+
+    def or_(self, f, g):
+        return self.ite(f, TRUE, g)
+
+    def xor(self, f, g):
+        return self.ite(f, self.not_(g), g)
+
+    def leq(self, f, g):
+        # True when f implies g
+        return self.ite(f, g, TRUE) == TRUE
+
+    def restrict(self, f, i, value):
+        # Cofactor of f with variable i fixed to value
+        key = ('restrict', f, i, value)
+        result = self.computed.get(key)
+        if result is not None:
+            return result
+        if self._level(f) > self.level[i]:
+            result = f
+        elif self.var[f] == i:
+            result = self.high[f] if value else self.low[f]
+        else:
+            result = self._mk(self.var[f], self.restrict(self.low[f], i, value),
+                              self.restrict(self.high[f], i, value))
+        self.computed[key] = result
+        return result
+
+    def from_cube(self, value, mask):
+        # AND of the literals the cube fixes, chained bottom level first
+        fixed = [i for i in range(self.num_vars) if not mask >> (self.num_vars - 1 - i) & 1]
+        u = TRUE
+        for i in sorted(fixed, key=self.level.get, reverse=True):
+            if value >> (self.num_vars - 1 - i) & 1:
+                u = self._mk(i, FALSE, u)
+            else:
+                u = self._mk(i, u, FALSE)
+        return u
+
+    def from_cubes(self, cubes):
+        u = FALSE
+        for cube in cubes:
+            value, mask = cube if isinstance(cube, tuple) else (cube.value, cube.mask)
+            u = self.or_(u, self.from_cube(value, mask))
+        return u
+
+    def from_terms(self, terms):
+        full = (1 << self.num_vars) - 1
+        return self.from_cubes([(t & full, 0) for t in terms])
+
+    def from_expression(self, expr, mode='SOP'):
+        # The target set of an equation as written by _format_output: its ones
+        # for SOP, its zeros for POS
+        return self.from_cubes(parse_expression(expr, self.num_vars, mode))
+
+    # --- statistics ---
+
+    def _nodes(self, roots):
+        seen = set()
+        stack = [u for u in roots if u > TRUE]
+        while stack:
+            u = stack.pop()
+            if u in seen:
+                continue
+            seen.add(u)
+            stack.extend(c for c in (self.low[u], self.high[u]) if c > TRUE and c not in seen)
+        return seen
+
+    def size(self, roots):
+        # Internal nodes reachable from the given roots
+        return len(self._nodes(roots))
+
+    def sat_count(self, f):
+        # Number of minterms over all num_vars variables where f is 1
+        counts = {FALSE: 0, TRUE: 1}
+
+        def count(u):
+            if u not in counts:
+                level = self._level(u)
+                lo, hi = self.low[u], self.high[u]
+                counts[u] = (count(lo) << (self._level(lo) - level - 1)) + \
+                            (count(hi) << (self._level(hi) - level - 1))
+            return counts[u]
+
+        return count(f) << self._level(f)
+
+    def support(self, f):
+        return sorted({self.var[u] for u in self._nodes([f])})
+
+    def stats(self, f):
+        return {'on_set': self.sat_count(f), 'support': self.support(f), 'nodes': self.size([f])}
+
+    def evaluate(self, f, minterm):
+        while f > TRUE:
+            bit = minterm >> (self.num_vars - 1 - self.var[f]) & 1
+            f = self.high[f] if bit else self.low[f]
+        return f == TRUE
+
+    # --- covers ---
+
+    def isop(self, lower, upper):
+        # Minato-Morreale irredundant sum of products of some g with
+        # lower <= g <= upper. Returns (cubes as (value, mask), g).
+        memo = {}
+        full = (1 << self.num_vars) - 1
+
+        def rec(L, U):
+            if L == FALSE:
+                return [], FALSE
+            if U == TRUE:
+                return [(0, full)], TRUE
+            key = (L, U)
+            if key in memo:
+                return memo[key]
+            level = min(self._level(L), self._level(U))
+            var = self.order[level]
+            bit = 1 << (self.num_vars - 1 - var)
+            L0, L1 = self._cofactors(L, level)
+            U0, U1 = self._cofactors(U, level)
+            # Minterms only coverable with the literal fixed to 0 / to 1
+            cubes0, g0 = rec(self.and_(L0, self.not_(U1)), U0)
+            cubes1, g1 = rec(self.and_(L1, self.not_(U0)), U1)
+            # The rest is covered without this variable
+            rest = self.or_(self.and_(L0, self.not_(g0)), self.and_(L1, self.not_(g1)))
+            cubes_any, g_any = rec(rest, self.and_(U0, U1))
+            cubes = [(v, m & ~bit) for v, m in cubes0] + \
+                    [(v | bit, m & ~bit) for v, m in cubes1] + cubes_any
+            g = self.or_(self._mk(var, g0, g1), g_any)
+            memo[key] = (cubes, g)
+            return memo[key]
+
+        return rec(lower, upper)
+
+    def cover(self, f, dc=FALSE):
+        # Irredundant cover of f by prime implicants of f + dc, as Cube objects
+        # sorted by size like KMapSolver.solve(). Built from an ISOP whose
+        # cubes are expanded to primes, then redundant primes are dropped.
+        care = self.and_(f, self.not_(dc))
+        upper = self.or_(f, dc)
+        cubes, _ = self.isop(care, upper)
+
+        primes = []
+        for value, mask in cubes:
+            # Greedy literal removal reaches a prime: once a literal cannot be
+            # dropped, dropping others only makes the cube larger
+            for i in range(self.num_vars):
+                bit = 1 << (self.num_vars - 1 - i)
+                if not mask & bit and self.leq(self.from_cube(value & ~bit, mask | bit), upper):
+                    value, mask = value & ~bit, mask | bit
+            if (value, mask) not in primes:
+                primes.append((value, mask))
+
+        # Drop primes whose care minterms the others already cover, trying the
+        # most specific (most literals) ones first
+        primes.sort(key=lambda c: bin(c[1]).count('1'))
+        kept = list(primes)
+        for cube in primes:
+            others = self.from_cubes([c for c in kept if c != cube])
+            if self.leq(self.and_(care, self.from_cube(*cube)), others):
+                kept.remove(cube)
+
+        kept = [Cube(value, mask, self.num_vars) for value, mask in kept]
+        kept.sort(key=len, reverse=True)
+        return kept
+
+    # --- reordering ---
+
+    def _rebuilt(self, order, roots):
+        fresh = BDD(self.num_vars, order)
+        moved = {FALSE: FALSE, TRUE: TRUE}
+
+        def transfer(u):
+            if u not in moved:
+                moved[u] = fresh.ite(fresh.variable(self.var[u]), transfer(self.high[u]), transfer(self.low[u]))
+            return moved[u]
+
+        return fresh, [transfer(u) for u in roots]
+
+    def reorder(self, order, roots):
+        # Rebuilds the diagram under a new variable order, keeping only nodes
+        # reachable from roots; returns the roots' new node ids. Node ids from
+        # before the call are no longer valid.
+        fresh, new_roots = self._rebuilt(order, roots)
+        self.__dict__.update(fresh.__dict__)
+        self.computed = {}
+        return new_roots
+
+    def sift(self, roots, max_passes=1):
+        # Rudell-style sifting: each variable in turn is tried at every level
+        # and left where the diagram is smallest. Trial orders are evaluated
+        # by rebuilding, so this suits diagrams of up to a few thousand nodes.
+        best_size = self.size(roots)
+        for _ in range(max_passes):
+            improved = False
+            for var in list(self.order):
+                base = [v for v in self.order if v != var]
+                best_order = None
+                for position in range(self.num_vars):
+                    order = base[:position] + [var] + base[position:]
+                    if order == self.order:
+                        continue
+                    trial, trial_roots = self._rebuilt(order, roots)
+                    size = trial.size(trial_roots)
+                    if size < best_size:
+                        best_size, best_order = size, order
+                if best_order is not None:
+                    roots = self.reorder(best_order, roots)
+                    improved = True
+            if not improved:
+                break
+        return roots
+
+
+def format_cover(cubes, num_vars, mode='SOP'):
+    # (equation, logic_parts, groups) for a cover, as KMapSolver.solve() returns
+    return KMapSolver(num_vars, [], [], mode)._format_output(cubes)
+
+
+def solve_bdd(solver):
+    # Drop-in for solver.solve() that goes through a BDD instead of prime
+    # implicant tables. The cover is prime and irredundant but not
+    # necessarily minimum, so solver.proven_minimal is set to False unless
+    # the cover is empty, the constant 1, or the function's only prime: a
+    # single cube without don't cares. With don't cares another prime with
+    # fewer literals may cover the same on-set.
+    manager = BDD(solver.num_vars)
+    f = manager.from_terms(solver.target_terms)
+    dc = manager.from_terms(solver.dont_cares)
+    cover = manager.cover(f, dc)
+    full = (1 << solver.num_vars) - 1
+    solver.proven_minimal = (not cover or (len(cover) == 1 and (not solver.dont_cares or cover[0].mask == full)))
+    return solver._format_output(cover)
@@ -0,0 +1,288 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from kmap_logic import KMapSolver, Cube, _cover_cost, _search_covers
+
+# Preprocessing that shrinks a minimization problem before and during the
+# cover search:
+#   1. support reduction - variables the function does not depend on (given
+#      its don't cares) are dropped before prime implicant generation;
+#   2. disjoint parts - when F = F1(X1) + F2(X2) + ... over disjoint sets of
+#      variables, found from the truth table before any prime is generated,
+#      each part is minimized on its own variables only, so prime generation
+#      costs 2^|X1| + 2^|X2| + ... instead of 2^(|X1| + |X2| + ...);
+#   3. cover components - after essentials are taken, the covering table of
+#      each part splits into components sharing no minterms, which are solved
+#      separately (optionally in worker processes).
+# Results are lifted back onto the original variables, so the equation uses
+# the same names as a plain solve().
+
+
+def reduce_support(num_vars, targets, dont_cares):
+    # Returns (kept, targets, dont_cares, exact). kept lists the original
+    # variable positions (0 = A) still in the support, MSB first; the term
+    # sets are re-indexed over those variables. exact is False when removing
+    # a variable required fixing some don't cares.
+    outputs = np.zeros(2**num_vars, dtype=np.int8)
+    if dont_cares:
+        outputs[np.fromiter(dont_cares, dtype=np.int64)] = -1
+    if targets:
+        outputs[np.fromiter(targets, dtype=np.int64)] = 1
+
+    kept = list(range(num_vars))
+    exact = True
+    for position in range(num_vars - 1, -1, -1):
+        # Split the table on this variable: low half has it 0, high half 1
+        bit = len(kept) - 1 - kept.index(position)
+        halves = outputs.reshape(-1, 2, 2**bit)
+        low, high = halves[:, 0, :], halves[:, 1, :]
+        if np.any((low >= 0) & (high >= 0) & (low != high)):
+            continue
+        # Vacuous: fold the halves, a don't care taking the other side's value
+        exact = exact and bool(np.all(low == high))
+        outputs = np.where(low == -1, high, low).reshape(-1)
+        kept.remove(position)
+
+    return kept, set(np.flatnonzero(outputs == 1).tolist()), set(np.flatnonzero(outputs == -1).tolist()), exact
+
+
+def lift_cube(cube, positions, num_vars):
+    # Maps a cube over a subset of variables (positions, MSB first) back onto
+    # num_vars variables; the other variables become eliminated positions
+    value = 0
+    mask = (1 << num_vars) - 1
+    width = len(positions)
+    for j, position in enumerate(positions):
+        bit = 1 << (num_vars - 1 - position)
+        local = 1 << (width - 1 - j)
+        if not cube.mask & local:
+            mask &= ~bit
+            if cube.value & local:
+                value |= bit
+    return Cube(value, mask, num_vars)
+
+
+def project_cube(value, mask, positions, num_vars):
+    # Inverse of lift_cube: keeps only the variables in positions
+    width = len(positions)
+    local_value, local_mask = 0, 0
+    for j, position in enumerate(positions):
+        bit = 1 << (num_vars - 1 - position)
+        local = 1 << (width - 1 - j)
+        if mask & bit:
+            local_mask |= local
+        elif value & bit:
+            local_value |= local
+    return local_value, local_mask
+
+
+def variable_groups(primes, num_vars):
+    # Partitions the variables so that every prime only fixes variables of
+    # one group (union-find over variables fixed together by some prime)
+    parent = list(range(num_vars))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for value, mask in primes:
+        fixed = [p for p in range(num_vars) if not mask >> (num_vars - 1 - p) & 1]
+        for position in fixed[1:]:
+            parent[find(position)] = find(fixed[0])
+
+    groups = {}
+    for position in range(num_vars):
+        groups.setdefault(find(position), []).append(position)
+    return list(groups.values())
+
+
+def or_partition(width, targets):
+    # Split F = F1(X1) + F2(X2) + ... of a function without don't cares, as
+    # [(positions, part_targets)], or None if it does not split. F splits so
+    # exactly when its off-set S is the product of the parts' off-sets, i.e.
+    # |S| = |S on X1| * |S on X2| * ... for the projections. Variables of
+    # different parts never interact on a 2x2 subcube (its zeros always form
+    # a rectangle), so union-find over the pairs that do gives blocks that
+    # parts are made of; parts are then peeled off one at a time, growing
+    # each from one block until it separates from the rest.
+    on = np.zeros(2**width, dtype=bool)
+    on[np.fromiter(targets, dtype=np.int64)] = True
+    parent = list(range(width))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(width):
+        for j in range(i + 1, width):
+            if find(i) == find(j):
+                continue
+            # Bits of positions i < j (0 = MSB) as axes 1 and 3 of a view
+            hi, lo = width - 1 - i, width - 1 - j
+            square = on.reshape(2**(width - 1 - hi), 2, 2**(hi - lo - 1), 2, 2**lo)
+            f00, f01 = square[:, 0, :, 0, :], square[:, 0, :, 1, :]
+            f10, f11 = square[:, 1, :, 0, :], square[:, 1, :, 1, :]
+            zeros = 4 - (f00.astype(np.int8) + f01 + f10 + f11)
+            diagonal = (f00 == f11) & (f01 == f10) & (f00 != f01)
+            if np.any((zeros == 3) | diagonal):
+                parent[find(j)] = find(i)
+
+    blocks = {}
+    for position in range(width):
+        blocks.setdefault(find(position), []).append(position)
+    off = np.flatnonzero(~on)
+    if len(blocks) == 1 or not off.size:
+        return None
+
+    def project(positions):
+        key = np.zeros(off.size, dtype=np.int64)
+        for position in positions:
+            key = key << 1 | (off >> (width - 1 - position) & 1)
+        return key
+
+    def size(block_list):
+        return np.unique(project([p for block in block_list for p in block])).size
+
+    parts = []
+    remaining = list(blocks.values())
+    while len(remaining) > 1:
+        total = size(remaining)
+        part, rest = remaining[:1], remaining[1:]
+        while rest and size(part) * size(rest) != total:
+            # Grow by the block that brings the two sides closest to a product
+            best = min(rest, key=lambda block: size(part + [block]) * size([b for b in rest if b is not block]))
+            part.append(best)
+            rest.remove(best)
+        parts.append(sorted(p for block in part for p in block))
+        remaining = rest
+    parts += [sorted(remaining[0])] if remaining else []
+    if len(parts) == 1:
+        return None
+
+    result = []
+    for positions in parts:
+        part_off = np.bincount(project(positions), minlength=2**len(positions)) > 0
+        result.append((positions, set(np.flatnonzero(~part_off).tolist())))
+    return result
+
+
+def split_cover(rows, need):
+    # Splits a covering table into components that share no needed minterm.
+    # rows[i] is the bitset of needed minterms cube i covers.
+    # Returns [(cube_indices, component_need)].
+    components = []
+    pending = [i for i, row in enumerate(rows) if row & need]
+    while pending:
+        members = [pending.pop()]
+        part_need = rows[members[0]] & need
+        grown = True
+        while grown:
+            grown = False
+            for i in list(pending):
+                if rows[i] & part_need:
+                    pending.remove(i)
+                    members.append(i)
+                    part_need |= rows[i] & need
+                    grown = True
+        components.append((sorted(members), part_need))
+    return components
+
+
+def _greedy_cover(rows, need):
+    chosen = []
+    while need:
+        best = max(range(len(rows)), key=lambda i: bin(rows[i] & need).count('1'))
+        chosen.append(best)
+        need &= ~rows[best]
+    return chosen
+
+
+def _solve_component(job):
+    # Returns (chosen row indices, proven minimal) for one component.
+    # stop_at is shared by all components; time.monotonic() is system-wide,
+    # so it holds in worker processes too.
+    cubes, rows, need, stop_at = job
+    chosen = _greedy_cover(rows, need)
+    if stop_at is None:
+        # Greedy ignores literals and ties, so it proves nothing (as in solve())
+        return chosen, False
+    best = [_cover_cost(cubes, chosen)]
+    for better in _search_covers(cubes, rows, need, best, stop_at):
+        best[0] = _cover_cost(cubes, better)
+        chosen = better
+    return chosen, time.monotonic() <= stop_at
+
+
+def solve_decomposed(solver, engine='python', deadline=None, workers=None):
+    # Drop-in for solver.solve(engine, deadline): same (equation, logic_parts,
+    # groups) result and solver.proven_minimal flag, but the problem is
+    # reduced and decomposed first. workers > 1 solves components in parallel.
+    stop_at = None if deadline is None else time.monotonic() + deadline
+    num_vars = solver.num_vars
+    kept, targets, dont_cares, exact = reduce_support(num_vars, solver.target_terms, solver.dont_cares)
+    width = len(kept)
+
+    reduced = KMapSolver(width, targets, dont_cares, mode='SOP')
+    trivial = reduced._trivial_cover()
+    if trivial is not None:
+        solver.proven_minimal = exact
+        return solver._format_output([lift_cube(c, kept, num_vars) for c in trivial])
+
+    # Disjoint parts only separate cleanly when no don't cares are left: then
+    # each part has to cover its own projection of the on-set by itself
+    split = None if dont_cares else or_partition(width, targets)
+    if split is not None:
+        parts = []
+        for positions, part_targets in split:
+            part = KMapSolver(len(positions), part_targets, [], mode='SOP')
+            parts.append((positions, part, part._generate_primes(engine)))
+        groups = []
+    else:
+        primes = reduced._generate_primes(engine)
+        parts = [(list(range(width)), reduced, primes)]
+        # Fallback for a split the greedy grouping in or_partition missed
+        groups = variable_groups(primes, width) if not dont_cares else []
+    if len(groups) > 1:
+        parts = []
+        for positions in groups:
+            part_primes = set()
+            for value, mask in primes:
+                local = project_cube(value, mask, positions, width)
+                if local[1] != (1 << len(positions)) - 1:
+                    part_primes.add(local)
+            on_set = set()
+            for value, mask in part_primes:
+                on_set.update(Cube(value, mask, len(positions)))
+            parts.append((positions, KMapSolver(len(positions), on_set, [], mode='SOP'), part_primes))
+
+    final_pis = []
+    jobs = []
+    for positions, part, part_primes in parts:
+        relevant_pis, pi_covers, essential_indices = part._cover_chart(engine, part_primes)
+        core, cubes, rows, need = part._cyclic_core(relevant_pis, pi_covers, essential_indices)
+        final_pis.extend((positions, relevant_pis[i]) for i in essential_indices)
+        for members, part_need in split_cover(rows, need):
+            jobs.append((positions, ([cubes[i] for i in members], [rows[i] & part_need for i in members],
+                                     part_need, stop_at)))
+
+    if workers and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(_solve_component, [job for _, job in jobs]))
+    else:
+        results = [_solve_component(job) for _, job in jobs]
+
+    proven = exact
+    for (positions, job), (chosen, part_proven) in zip(jobs, results):
+        final_pis.extend((positions, job[0][i]) for i in chosen)
+        proven = proven and part_proven
+
+    solver.proven_minimal = proven
+    final_pis = [lift_cube(lift_cube(c, positions, width), kept, num_vars) for positions, c in final_pis]
+    final_pis.sort(key=len, reverse=True)
+    return solver._format_output(final_pis)
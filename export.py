@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+
+from kmap_logic import KMapSolver
+from metrics import resident_memory_bytes
+from visualizer import KMapVisualizer
+
+# Bulk export of solved K-maps. Each problem is a dict like
+#   {"name": "q1", "num_vars": 4, "minterms": [0, 2, 8, 10], "dont_cares": [], "mode": "SOP"}
+# and is solved and rendered in a worker process, either as the final grouped
+# map or as the full step sequence the app animates. A step sequence is drawn
+# on one figure that grows frame by frame (KMapVisualizer.frame_figures).
+
+FORMATS = ('png', 'svg', 'pdf')
+WORKER_MEMORY_MB = 150      # estimated peak RSS of one rendering worker, used to size the pool
+RECYCLE_EVERY = 250         # problems a worker renders before it is replaced
+PNG_COMPRESS_LEVEL = 1      # zlib level for PNGs; the default 6 costs more than it saves here
+
+
+def _file_names(problems):
+    # One output name per problem: its name reduced to a plain file name, so
+    # it cannot point outside out_dir, or kmap_NNNN. Repeats (compared without
+    # case, for case-insensitive file systems) get _2, _3, ... appended.
+    names, taken = [], set()
+    for index, problem in enumerate(problems):
+        base = re.sub(r'[^A-Za-z0-9._-]+', '_', str(problem.get('name') or '')).strip('._')
+        base = base or f"kmap_{index:04d}"
+        name, n = base, 1
+        while name.lower() in taken:
+            n += 1
+            name = f"{base}_{n}"
+        taken.add(name.lower())
+        names.append(name)
+    return names
+
+
+def _render_problem(job):
+    name, problem, out_dir, fmt, steps, theme, dpi = job
+    num_vars = problem['num_vars']
+    minterms = problem.get('minterms', [])
+    dont_cares = problem.get('dont_cares', [])
+    mode = problem.get('mode', 'SOP')
+
+    solver = KMapSolver(num_vars, minterms, dont_cares, mode=mode)
+    equation, logic_parts, groups = solver.solve()
+    visualizer = KMapVisualizer(num_vars, minterms, dont_cares, groups, theme)
+
+    if steps:
+        figures = visualizer.frame_figures()
+    else:
+        figures = [visualizer.draw(**list(visualizer.frames())[-1])]
+    save_options = {'dpi': dpi or 'figure'}
+    if fmt == 'png':
+        save_options['pil_kwargs'] = {'compress_level': PNG_COMPRESS_LEVEL}
+
+    files = []
+    fig = None
+    if fmt == 'pdf':
+        # One document per problem, one page per frame
+        path = os.path.join(out_dir, f"{name}.pdf")
+        with PdfPages(path) as pdf:
+            for fig in figures:
+                fig.suptitle(f"F = {equation}", color='white' if theme == 'dark' else 'black')
+                pdf.savefig(fig, facecolor=fig.get_facecolor(), **save_options)
+        files.append(path)
+    else:
+        for i, fig in enumerate(figures):
+            suffix = f"_step{i + 1:02d}" if steps else ""
+            path = os.path.join(out_dir, f"{name}{suffix}.{fmt}")
+            fig.savefig(path, facecolor=fig.get_facecolor(), **save_options)
+            files.append(path)
+    if fig is not None:
+        plt.close(fig)
+
+    return {'name': name, 'equation': equation, 'files': files,
+            'worker_rss_mb': round(resident_memory_bytes() / 2**20, 1)}
+
+
+def export_problems(problems, out_dir, fmt='png', steps=False, theme='light',
+                    workers=None, max_memory_mb=None, dpi=None):
+    # Renders every problem and returns one {'name', 'equation', 'files',
+    # 'worker_rss_mb'} per problem, in input order; worker_rss_mb is the
+    # measured RSS of the process that rendered it. The pool is sized to the
+    # CPU count, reduced so that workers * WORKER_MEMORY_MB stays under
+    # max_memory_mb. That is a worker-count heuristic, not an enforced limit:
+    # compare it with the measured worker_rss_mb. Workers are recycled every
+    # RECYCLE_EVERY problems so matplotlib caches cannot grow. dpi defaults to
+    # the figure's own (100).
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {FORMATS}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if max_memory_mb is not None:
+        workers = min(workers, max_memory_mb // WORKER_MEMORY_MB)
+    workers = max(1, min(workers, len(problems)))
+
+    jobs = [(name, p, out_dir, fmt, steps, theme, dpi) for name, p in zip(_file_names(problems), problems)]
+    if workers == 1:
+        return [_render_problem(job) for job in jobs]
+
+    # Hand out work in chunks so small problems are not dominated by IPC
+    chunksize = max(1, min(32, len(jobs) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=RECYCLE_EVERY) as pool:
+        return list(pool.map(_render_problem, jobs, chunksize=chunksize))
+
+
+def load_problems(path):
+    # A JSON list of problems, or one JSON problem per line
+    with open(path) as f:
+        text = f.read()
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve and render K-map problems in bulk.")
+    parser.add_argument("problems", help="JSON list or JSON-lines file of problems")
+    parser.add_argument("--out", default="exports", help="output directory")
+    parser.add_argument("--format", choices=FORMATS, default='png')
+    parser.add_argument("--steps", action="store_true", help="render every animation step, not just the final map")
+    parser.add_argument("--theme", choices=['light', 'dark'], default='light')
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-memory", type=int, default=None,
+                        help=f"memory budget for the worker pool, in MB; caps the worker count "
+                             f"at budget / {WORKER_MEMORY_MB} MB (an estimate, not enforced)")
+    parser.add_argument("--dpi", type=int, default=None, help="raster resolution (default: 100)")
+    args = parser.parse_args(argv)
+
+    problems = load_problems(args.problems)
+    start = time.perf_counter()
+    results = export_problems(problems, args.out, args.format, args.steps, args.theme,
+                              args.workers, args.max_memory, args.dpi)
+    elapsed = time.perf_counter() - start
+    num_files = sum(len(r['files']) for r in results)
+    peak = max((r['worker_rss_mb'] for r in results), default=0)
+    print(f"Rendered {len(results)} problems ({num_files} files) to {args.out} in {elapsed:.2f}s; "
+          f"peak worker RSS {peak:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
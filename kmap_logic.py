@@ -1,6 +1,62 @@
 import pandas as pd
 import numpy as np
-from itertools import combinations
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, product
+
+
+class Cube:
+    # An implicant kept as (value, mask) instead of a list of minterms.
+    # Behaves like a read-only sorted list of the minterms it covers, which
+    # are only expanded when iterated.
+    __slots__ = ('value', 'mask', 'num_vars')
+
+    def __init__(self, value, mask, num_vars):
+        self.value = value
+        self.mask = mask
+        self.num_vars = num_vars
+
+    def __len__(self):
+        return 1 << bin(self.mask).count('1')
+
+    def __iter__(self):
+        # Walk the submasks of mask in increasing order
+        sub = 0
+        while True:
+            yield self.value | sub
+            if sub == self.mask:
+                return
+            sub = (sub - self.mask) & self.mask
+
+    def __contains__(self, minterm):
+        return minterm & ~self.mask == self.value
+
+    def __eq__(self, other):
+        if isinstance(other, Cube):
+            return (self.value, self.mask, self.num_vars) == (other.value, other.mask, other.num_vars)
+        try:
+            return list(self) == sorted(other)
+        except TypeError:
+            return NotImplemented
+
+    def __hash__(self):
+        return hash((self.value, self.mask, self.num_vars))
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def to_bin(self):
+        # e.g. value=0b0000, mask=0b0101 -> '-0-0' is written MSB (A) first
+        bits = []
+        for i in range(self.num_vars - 1, -1, -1):
+            if self.mask >> i & 1:
+                bits.append('-')
+            else:
+                bits.append(str(self.value >> i & 1))
+        return "".join(bits)
+
 
 class KMapSolver:
     def __init__(self, num_vars, minterms, dont_cares, mode='SOP'):
@@ -9,6 +65,8 @@ class KMapSolver:
         self.dont_cares = set(dont_cares)
         self.mode = mode
         self.variables = [chr(65 + i) for i in range(num_vars)]  # A, B, C, D...
+        # Cover chart of the last solve, kept for iter_minimal_covers()
+        self._chart = None
         
         # Validation
         max_val = 2**num_vars - 1
@@ -28,102 +86,118 @@ class KMapSolver:
             self.target_terms = self.minterms
 
     def get_truth_table(self):
-        rows = []
-        for i in range(2**self.num_vars):
-            row = {}
-            # Binary representation
-            bin_str = format(i, f'0{self.num_vars}b')
-            for j, var in enumerate(self.variables):
-                row[var] = int(bin_str[j])
-            
-            # Output
-            if i in self.minterms:
-                row['Output'] = 0 if self.mode == 'POS' else 1
-            elif i in self.dont_cares:
-                row['Output'] = 'X'
-            else:
-                row['Output'] = 1 if self.mode == 'POS' else 0
-            
-            row['Minterm'] = i
-            rows.append(row)
-        return pd.DataFrame(rows)
+        return self.truth_table_rows(np.arange(2**self.num_vars))
+
+    def get_output_array(self):
+        # Output column as one int8 per minterm: 1, 0, or -1 for a don't care.
+        # Cheap enough to filter and page through without building a DataFrame.
+        on_value, off_value = (0, 1) if self.mode == 'POS' else (1, 0)
+        outputs = np.full(2**self.num_vars, off_value, dtype=np.int8)
+        if self.minterms:
+            outputs[np.fromiter(self.minterms, dtype=np.int64)] = on_value
+        if self.dont_cares:
+            outputs[np.fromiter(self.dont_cares, dtype=np.int64)] = -1
+        return outputs
+
+    def truth_table_rows(self, minterms, outputs=None):
+        # Truth table restricted to the given minterms (e.g. one page of it)
+        minterms = np.asarray(minterms, dtype=np.int64)
+        if outputs is None:
+            outputs = self.get_output_array()
+        table = {}
+        for j, var in enumerate(self.variables):
+            table[var] = (minterms >> (self.num_vars - 1 - j)) & 1
+        column = outputs[minterms].astype(object)
+        column[column == -1] = 'X'
+        table['Output'] = column
+        table['Minterm'] = minterms
+        return pd.DataFrame(table)
 
-    def solve(self):
+    def solve(self, engine='python', deadline=None, backend=None):
         # Quine-McCluskey Algorithm Implementation
-        
-        # 1. Group terms by number of 1s
-        # We include dont_cares in the grouping process to maximize group size
-        terms_to_group = self.target_terms | self.dont_cares
-        if not terms_to_group:
-            return "0", [], [] if self.mode == 'SOP' else "1", [], []
-        
-        # If all terms are present (tautology)
-        if len(terms_to_group) == 2**self.num_vars:
-            return "1", [], [list(terms_to_group)] if self.mode == 'SOP' else "0", [], [list(terms_to_group)]
+        # engine picks the prime implicant generator (see PI_ENGINES)
+        # deadline (seconds) bounds the whole solve and turns on anytime
+        # refinement: the greedy cover is improved by an exact search until
+        # time runs out. If prime generation, the chart or the greedy cover
+        # overrun it, the cover is finished from what is at hand (single
+        # minterms at worst). Afterwards self.proven_minimal says whether the
+        # returned cover is known minimum.
+        # backend hands the solve to a registered backend instead ('auto'
+        # picks one, see backends.py); self.backend records which one ran.
+        if backend is not None:
+            from backends import solve_with_backend
+            return solve_with_backend(self, backend, deadline)
+        return _run(self._solve_steps(engine, deadline, trace=False))
 
-        # Structure: groups[num_ones] = {binary_str: [minterms_covered]}
-        groups = {}
-        for term in terms_to_group:
-            bin_str = format(term, f'0{self.num_vars}b')
-            num_ones = bin_str.count('1')
-            if num_ones not in groups:
-                groups[num_ones] = {}
-            groups[num_ones][bin_str] = [term]
+    def trace(self, engine='python', deadline=None):
+        # Same solve, streamed: yields one event dict per step as it happens
+        # ('combine_round', 'merge', 'prime', 'essential', 'greedy_pick',
+        # 'refine') and finally a 'result' event with the solve() output.
+        # Cube-carrying events also hold the cube's 'term' string.
+        equation, logic_parts, groups = yield from self._solve_steps(engine, deadline, trace=True)
+        yield {'event': 'result', 'equation': equation, 'logic_parts': logic_parts,
+               'groups': groups, 'proven_minimal': self.proven_minimal}
 
-        prime_implicants = set()
-        
-        while True:
-            new_groups = {}
-            marked = set()
-            sorted_keys = sorted(groups.keys())
-            
-            for i in range(len(sorted_keys) - 1):
-                k1 = sorted_keys[i]
-                k2 = sorted_keys[i+1]
-                
-                # Optimization: k2 must be k1 + 1 for 1-bit difference check to be valid in terms of bit count
-                if k2 != k1 + 1:
-                    continue
-                    
-                for bin1, terms1 in groups[k1].items():
-                    for bin2, terms2 in groups[k2].items():
-                        diff = 0
-                        diff_idx = -1
-                        for idx in range(self.num_vars):
-                            if bin1[idx] != bin2[idx]:
-                                diff += 1
-                                diff_idx = idx
-                        
-                        if diff == 1:
-                            marked.add(bin1)
-                            marked.add(bin2)
-                            new_bin = list(bin1)
-                            new_bin[diff_idx] = '-'
-                            new_bin = "".join(new_bin)
-                            
-                            new_count = new_bin.count('1')
-                            if new_count not in new_groups:
-                                new_groups[new_count] = {}
-                            # Merge lists of covered terms
-                            new_groups[new_count][new_bin] = sorted(list(set(terms1 + terms2)))
+    def solve_dual(self, engine='python', deadline=None, backend=None, concurrent=False):
+        # Minimal SOP and POS of the same function, for callers that want
+        # whichever is cheaper. What the two forms share is the encoding: the
+        # output column is built once and split into the on-set and off-set,
+        # and the don't cares are listed once, then both are handed to the
+        # solves. Nothing else is shared - the two target sets have different
+        # prime implicants - so each form is an ordinary solve of its target
+        # set (SOP groups the 1s, POS the 0s) with the same engine and cover
+        # search. concurrent=True runs the POS solve in the shared worker pool
+        # while the SOP solve runs here; inside a pool worker both run here.
+        # One deadline covers the whole call: run one after the other, SOP
+        # gets half of it and POS whatever is left; run side by side, both
+        # get all of it.
+        # Returns {'SOP': ..., 'POS': ..., 'cheaper': 'SOP' or 'POS'}; each
+        # form holds equation, logic_parts, groups, proven_minimal, terms and
+        # literals. Fewer literals wins, then fewer terms, then self.mode.
+        stop_at = None if deadline is None else time.monotonic() + deadline
+        concurrent = concurrent and not in_worker_process()
+        sop_stop_at = stop_at if concurrent or stop_at is None else time.monotonic() + deadline / 2
+        outputs = self.get_output_array()
+        dont_cares = sorted(self.dont_cares)
+        jobs = {
+            'SOP': (self.num_vars, np.flatnonzero(outputs == 1).tolist(), dont_cares, 'SOP', engine, sop_stop_at, backend),
+            'POS': (self.num_vars, np.flatnonzero(outputs == 0).tolist(), dont_cares, 'POS', engine, stop_at, backend),
+        }
+        if concurrent:
+            # A pooled job must not fan out into the pool it is running on
+            pooled = tuple('numpy' if v == 'parallel' else v for v in jobs['POS'])
+            future = shared_pool().submit(_solve_form, pooled)
+            results = {'SOP': _solve_form(jobs['SOP']), 'POS': future.result()}
+        else:
+            results = {form: _solve_form(job) for form, job in jobs.items()}
+        costs = {form: (r['literals'], r['terms'], form != self.mode) for form, r in results.items()}
+        results['cheaper'] = min(costs, key=costs.get)
+        return results
 
-            # Add unmarked terms to prime implicants
-            for k in groups:
-                for bin_str, terms in groups[k].items():
-                    if bin_str not in marked:
-                        prime_implicants.add((bin_str, tuple(terms)))
-            
-            if not new_groups:
-                break
-            groups = new_groups
+    def _solve_steps(self, engine, deadline, trace):
+        # Generator behind solve() and trace(). With trace off nothing is
+        # yielded and no event is built, so solve() pays nothing for tracing.
+        stop_at = None if deadline is None else time.monotonic() + deadline
+        self.proven_minimal = True
+        self.backend = engine
+        trivial = self._trivial_cover()
+        if trivial is not None:
+            return self._format_output(trivial)
 
-        # 2. Select Essential Prime Implicants
-        # Filter PIs to only those that cover at least one target_term (exclude PIs made purely of dont_cares)
-        relevant_pis = []
-        for pi_bin, covered_terms in prime_implicants:
-            # Check if this PI covers any required minterms (not just dont cares)
-            if any(t in self.target_terms for t in covered_terms):
-                relevant_pis.append({'bin': pi_bin, 'terms': covered_terms})
+        if trace and engine == 'python':
+            prime_implicants = yield from self._iter_prime_implicants(self.target_terms | self.dont_cares, trace, stop_at)
+        else:
+            prime_implicants = self._generate_primes(engine, stop_at)
+            if trace:
+                for value, mask in sorted(prime_implicants):
+                    yield self._event('prime', Cube(value, mask, self.num_vars))
+        if _expired(stop_at):
+            # No time left to chart the implicants found so far
+            relevant_pis, pi_covers, essential_indices = [], [], []
+        else:
+            relevant_pis, pi_covers, essential_indices = self._cover_chart(engine, prime_implicants, stop_at)
+            if not _expired(stop_at):
+                self._chart = (relevant_pis, pi_covers, essential_indices)
         
         # Petrick's method or simple coverage for small N
         # For N<=4, a greedy approach with "Essential" check usually suffices or simple recursion.
@@ -132,70 +206,278 @@ class KMapSolver:
         final_pis = []
         covered_minterms = set()
         
-        # Find essential PIs
-        # Map minterm -> list of PIs covering it
-        mt_map = {mt: [] for mt in self.target_terms}
-        for i, pi in enumerate(relevant_pis):
-            for term in pi['terms']:
-                if term in self.target_terms:
-                    mt_map[term].append(i)
-        
-        # If a minterm is covered by only one PI, that PI is essential
-        essential_indices = set()
-        for mt, pi_indices in mt_map.items():
-            if len(pi_indices) == 1:
-                essential_indices.add(pi_indices[0])
-        
         for idx in essential_indices:
             final_pis.append(relevant_pis[idx])
-            for term in relevant_pis[idx]['terms']:
-                if term in self.target_terms:
-                    covered_minterms.add(term)
+            covered_minterms.update(pi_covers[idx])
+            if trace:
+                yield self._event('essential', relevant_pis[idx], covers=sorted(pi_covers[idx]))
         
         # Cover remaining minterms
         remaining_minterms = self.target_terms - covered_minterms
+        out_of_time = False
         if remaining_minterms:
             # Greedy approach: pick PI that covers most remaining minterms
             # Filter remaining PIs
             potential_indices = [i for i in range(len(relevant_pis)) if i not in essential_indices]
             
             while remaining_minterms:
+                if _expired(stop_at):
+                    out_of_time = True
+                    break
                 best_pi_idx = -1
                 max_cover = -1
                 
                 for idx in potential_indices:
                     # Count how many REMAINING minterms this PI covers
-                    count = 0
-                    for t in relevant_pis[idx]['terms']:
-                        if t in remaining_minterms:
-                            count += 1
+                    count = len(pi_covers[idx] & remaining_minterms)
                     if count > max_cover:
                         max_cover = count
                         best_pi_idx = idx
                 
                 if best_pi_idx != -1:
                     final_pis.append(relevant_pis[best_pi_idx])
-                    for t in relevant_pis[best_pi_idx]['terms']:
-                        if t in remaining_minterms:
-                            remaining_minterms.remove(t)
+                    if trace:
+                        yield self._event('greedy_pick', relevant_pis[best_pi_idx],
+                                          covers=sorted(pi_covers[best_pi_idx] & remaining_minterms))
+                    remaining_minterms -= pi_covers[best_pi_idx]
                     potential_indices.remove(best_pi_idx)
                 else:
                     # Should not happen if logic is correct
                     break
+
+            if out_of_time:
+                # Finish in one linear pass: largest charted implicants first,
+                # then a single-minterm cube for anything still uncovered
+                potential_indices.sort(key=lambda i: len(pi_covers[i]), reverse=True)
+                for idx in potential_indices:
+                    covers = pi_covers[idx] & remaining_minterms
+                    if covers:
+                        final_pis.append(relevant_pis[idx])
+                        remaining_minterms -= covers
+                        if trace:
+                            yield self._event('greedy_pick', relevant_pis[idx], covers=sorted(covers))
+                for term in sorted(remaining_minterms):
+                    final_pis.append(Cube(term, 0, self.num_vars))
+                    if trace:
+                        yield self._event('greedy_pick', final_pis[-1], covers=[term])
+
+            # Greedy is only a guess once there is a cyclic core
+            self.proven_minimal = False
+            if stop_at is not None and not out_of_time:
+                core, cubes, rows, need = self._cyclic_core(relevant_pis, pi_covers, essential_indices)
+                greedy = [core.index(relevant_pis.index(pi)) for pi in final_pis[len(essential_indices):]]
+                best = [_cover_cost(cubes, greedy)]
+                improved = None
+                for chosen in _search_covers(cubes, rows, need, best, stop_at):
+                    best[0] = _cover_cost(cubes, chosen)
+                    improved = chosen
+                    if trace:
+                        yield {'event': 'refine', 'terms': len(essential_indices) + best[0][0],
+                               'cover': final_pis[:len(essential_indices)] + [cubes[i] for i in chosen]}
+                if improved is not None:
+                    final_pis = final_pis[:len(essential_indices)] + [cubes[i] for i in improved]
+                self.proven_minimal = time.monotonic() <= stop_at
         
         # Sort PIs by size (descending) so largest groups (8, 4, 2) come first
-        final_pis.sort(key=lambda x: len(x['terms']), reverse=True)
+        final_pis.sort(key=len, reverse=True)
                     
         return self._format_output(final_pis)
 
+    def iter_minimal_covers(self, limit=None, deadline=None, engine='python'):
+        # Yields every minimum cover (fewest terms, then fewest literals) as a
+        # solve()-style (equation, logic_parts, groups) tuple, one at a time.
+        # limit caps how many are produced; deadline is a time budget in
+        # seconds after which the search stops quietly.
+        stop_at = None if deadline is None else time.monotonic() + deadline
+        trivial = self._trivial_cover()
+        if trivial is not None:
+            if limit is None or limit > 0:
+                yield self._format_output(trivial)
+            return
+
+        # The chart of an earlier solve is reused rather than rebuilt
+        if self._chart is None:
+            chart = self._cover_chart(engine, stop_at=stop_at)
+            if _expired(stop_at):
+                return
+            self._chart = chart
+        relevant_pis, pi_covers, essential_indices = self._chart
+        essentials = [relevant_pis[i] for i in essential_indices]
+        core, cubes, rows, need = self._cyclic_core(relevant_pis, pi_covers, essential_indices)
+
+        # First pass pins down the optimum cost, second pass lists every cover at it
+        best = [(len(cubes) + 1, 0)]
+        for chosen in _search_covers(cubes, rows, need, best, stop_at):
+            best[0] = _cover_cost(cubes, chosen)
+        if stop_at is not None and time.monotonic() > stop_at:
+            return
+
+        produced = 0
+        for chosen in _search_covers(cubes, rows, need, best, stop_at, keep_ties=True):
+            if limit is not None and produced >= limit:
+                return
+            final_pis = essentials + [cubes[i] for i in chosen]
+            final_pis.sort(key=len, reverse=True)
+            yield self._format_output(final_pis)
+            produced += 1
+
+    def _cyclic_core(self, relevant_pis, pi_covers, essential_indices):
+        # Cyclic core: what is left once the essentials are taken. Returns the
+        # chart indices of the core PIs, their cubes, the bitset of remaining
+        # minterms each one covers, and the bitset of all remaining minterms.
+        remaining = set(self.target_terms)
+        for idx in essential_indices:
+            remaining -= pi_covers[idx]
+
+        core = [i for i in range(len(relevant_pis))
+                if i not in essential_indices and pi_covers[i] & remaining]
+        cubes = [relevant_pis[i] for i in core]
+        bit_of = {mt: b for b, mt in enumerate(sorted(remaining))}
+        rows = [sum(1 << bit_of[mt] for mt in pi_covers[i] & remaining) for i in core]
+        return core, cubes, rows, (1 << len(bit_of)) - 1
+
+    def _trivial_cover(self):
+        # Constant outputs need no implicant search; None means "not trivial"
+        if not self.target_terms:
+            return []
+        
+        # If all terms are present (tautology)
+        if len(self.target_terms | self.dont_cares) == 2**self.num_vars:
+            return [Cube(0, 2**self.num_vars - 1, self.num_vars)]
+        return None
+
+    def _cover_chart(self, engine, prime_implicants=None, stop_at=None):
+        # prime_implicants may be passed in when they are already known.
+        # Past stop_at the chart is left partial and no PI is called essential.
+        if prime_implicants is None:
+            prime_implicants = self._generate_primes(engine, stop_at)
+
+        # 2. Select Essential Prime Implicants
+        # Filter PIs to only those that cover at least one target_term (exclude PIs made purely of dont_cares)
+        relevant_pis = []
+        pi_covers = []
+        for value, mask in sorted(prime_implicants):
+            if _expired(stop_at):
+                return relevant_pis, pi_covers, []
+            # Check if this PI covers any required minterms (not just dont cares)
+            covered = self._covered_targets(value, mask)
+            if covered:
+                relevant_pis.append(Cube(value, mask, self.num_vars))
+                pi_covers.append(covered)
+
+        # Find essential PIs
+        # Map minterm -> list of PIs covering it
+        mt_map = {mt: [] for mt in self.target_terms}
+        for i, covered in enumerate(pi_covers):
+            for term in covered:
+                mt_map[term].append(i)
+        
+        # If a minterm is covered by only one PI, that PI is essential
+        essential_indices = set()
+        for mt, pi_indices in mt_map.items():
+            if len(pi_indices) == 1:
+                essential_indices.add(pi_indices[0])
+
+        return relevant_pis, pi_covers, sorted(essential_indices)
+
+    def _generate_primes(self, engine, stop_at=None):
+        # Past stop_at an engine returns the implicants it has so far: they
+        # still cover every target, but need not all be prime
+        if engine not in PI_ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {sorted(PI_ENGINES)}")
+
+        # 1. Group terms by number of 1s
+        # We include dont_cares in the grouping process to maximize group size
+        return PI_ENGINES[engine](self, self.target_terms | self.dont_cares, stop_at)
+
+    def _prime_implicants(self, terms, stop_at=None):
+        return _run(self._iter_prime_implicants(terms, trace=False, stop_at=stop_at))
+
+    def _iter_prime_implicants(self, terms, trace, stop_at=None):
+        # Implicants are (value, mask) pairs: mask has a 1 for every eliminated
+        # variable and value holds the fixed bits (0 under the mask). The
+        # minterms an implicant covers are never stored, only implied.
+        # Structure: groups[num_ones] = {(value, mask), ...}
+        groups = {}
+        for term in terms:
+            groups.setdefault(bin(term).count('1'), set()).add((term, 0))
+
+        prime_implicants = set()
+        combine_round = 0
+        
+        while True:
+            combine_round += 1
+            merges = 0
+            new_groups = {}
+            marked = set()
+            sorted_keys = sorted(groups.keys())
+            
+            for i in range(len(sorted_keys) - 1):
+                k1 = sorted_keys[i]
+                k2 = sorted_keys[i+1]
+                
+                # Optimization: k2 must be k1 + 1 for 1-bit difference check to be valid in terms of bit count
+                if k2 != k1 + 1:
+                    continue
+                    
+                for value1, mask1 in groups[k1]:
+                    if _expired(stop_at):
+                        # Primes so far plus this level's implicants cover every term
+                        return prime_implicants | {imp for group in groups.values() for imp in group}
+                    for value2, mask2 in groups[k2]:
+                        # Mergeable when the dashes line up and the fixed bits
+                        # differ in exactly one position
+                        diff = value1 ^ value2
+                        if mask1 == mask2 and diff & (diff - 1) == 0:
+                            marked.add((value1, mask1))
+                            marked.add((value2, mask2))
+                            new_groups.setdefault(k1, set()).add((value1, mask1 | diff))
+                            if trace:
+                                merges += 1
+                                yield {'event': 'merge', 'round': combine_round,
+                                       'left': Cube(value1, mask1, self.num_vars),
+                                       'right': Cube(value2, mask2, self.num_vars),
+                                       'result': Cube(value1, mask1 | diff, self.num_vars)}
+
+            # Add unmarked terms to prime implicants
+            new_primes = 0
+            for k in groups:
+                for implicant in groups[k]:
+                    if implicant not in marked:
+                        prime_implicants.add(implicant)
+                        if trace:
+                            new_primes += 1
+                            yield self._event('prime', Cube(*implicant, self.num_vars), round=combine_round)
+            
+            if trace:
+                yield {'event': 'combine_round', 'round': combine_round, 'merges': merges,
+                       'implicants': sum(len(g) for g in new_groups.values()), 'primes': new_primes}
+            
+            if not new_groups:
+                break
+            groups = new_groups
+
+        return prime_implicants
+
+    def _event(self, kind, cube, **details):
+        event = {'event': kind, 'cube': cube, 'term': self._format_output([cube])[1][0]}
+        event.update(details)
+        return event
+
+    def _covered_targets(self, value, mask):
+        # Expand the cube or scan the target set, whichever is smaller
+        if 1 << bin(mask).count('1') <= len(self.target_terms):
+            return {t for t in Cube(value, mask, self.num_vars) if t in self.target_terms}
+        return {t for t in self.target_terms if t & ~mask == value}
+
     def _format_output(self, pis):
         # Format logic string and groups for visualization
         logic_parts = []
         groups = []
         
         for pi in pis:
-            bin_str = pi['bin']
-            groups.append(pi['terms'])
+            bin_str = pi.to_bin()
+            groups.append(pi)
             
             term_str = ""
             if self.mode == 'SOP':
@@ -228,3 +510,247 @@ class KMapSolver:
             equation = "".join(logic_parts)
             
         return equation, logic_parts, groups
+
+
+def _expired(stop_at):
+    return stop_at is not None and time.monotonic() > stop_at
+
+
+def _run(steps):
+    # Drives a step generator to completion and returns its return value
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+
+
+def _solve_form(job):
+    # One side of solve_dual(), top level so it can run in a worker process.
+    # stop_at is on the monotonic clock, which is system-wide, so time spent
+    # waiting for a pool worker counts against the deadline too.
+    num_vars, targets, dont_cares, mode, engine, stop_at, backend = job
+    deadline = None if stop_at is None else max(0.0, stop_at - time.monotonic())
+    solver = KMapSolver(num_vars, targets, dont_cares, mode=mode)
+    equation, logic_parts, groups = solver.solve(engine=engine, deadline=deadline, backend=backend)
+    terms, literals = _cover_cost(groups, range(len(groups)))
+    return {'equation': equation, 'logic_parts': logic_parts, 'groups': groups,
+            'proven_minimal': solver.proven_minimal, 'terms': terms, 'literals': literals}
+
+
+def _cover_cost(cubes, chosen):
+    # (terms, literals); a cube with k eliminated variables has num_vars - k literals
+    return (len(chosen), sum(c.num_vars - bin(c.mask).count('1') for c in (cubes[i] for i in chosen)))
+
+
+def _search_covers(cubes, rows, need, best, stop_at, keep_ties=False):
+    # Depth-first branch and bound over a covering table. rows[i] is the
+    # bitset of still-needed minterms cube i covers. best is a one-element
+    # list holding the cost to beat; callers may tighten it between yields.
+    # Branching on the minterm with the fewest candidates and forbidding the
+    # candidates already tried at that node lists each cover at most once.
+    literals = [c.num_vars - bin(c.mask).count('1') for c in cubes]
+    min_literals = min(literals, default=0)
+    chosen = []
+
+    def dfs(need, allowed, terms, lits):
+        if stop_at is not None and time.monotonic() > stop_at:
+            return
+        if not need:
+            cost = (terms, lits)
+            if cost < best[0] or (keep_ties and cost == best[0]):
+                yield list(chosen)
+            return
+
+        # Lower bound: at least ceil(|need| / widest remaining row) more terms
+        widest = max((bin(rows[i] & need).count('1') for i in allowed), default=0)
+        if not widest:
+            return
+        more = -(-bin(need).count('1') // widest)
+        bound = (terms + more, lits + more * min_literals)
+        if bound > best[0] or (bound == best[0] and not keep_ties):
+            return
+
+        # Branch on the needed minterm with the fewest candidates
+        pick, pick_rows = None, None
+        remaining = need
+        while remaining:
+            low = remaining & -remaining
+            remaining ^= low
+            candidates = [i for i in allowed if rows[i] & low]
+            if pick_rows is None or len(candidates) < len(pick_rows):
+                pick, pick_rows = low, candidates
+                if len(candidates) <= 1:
+                    break
+
+        pick_rows.sort(key=lambda i: (-bin(rows[i] & need).count('1'), literals[i]))
+        allowed = list(allowed)
+        for i in pick_rows:
+            allowed.remove(i)
+            chosen.append(i)
+            yield from dfs(need & ~rows[i], allowed, terms + 1, lits + literals[i])
+            chosen.pop()
+
+    yield from dfs(need, list(range(len(cubes))), 0, 0)
+
+
+def _sorted_unique(keys):
+    # np.unique, but always sort based: newer NumPy may pick a hash table,
+    # which is far slower on the millions of int64 keys a level can hold
+    keys = np.sort(keys)
+    if keys.size:
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    return keys
+
+
+def numpy_prime_implicants(terms, num_vars, stop_at=None):
+    # Same combine levels as KMapSolver._prime_implicants, but each level is a
+    # pair of int64 arrays (values, masks) and all merges for one bit position
+    # are found at once: two cubes merge on bit b when they share the key
+    # (mask, value with bit b cleared) and b is not already eliminated.
+    if num_vars > 31:
+        raise ValueError("numpy engine supports at most 31 variables")
+    values = _sorted_unique(np.fromiter(terms, dtype=np.int64))
+    masks = np.zeros_like(values)
+    full = (1 << num_vars) - 1
+    prime_values = []
+    prime_masks = []
+
+    while values.size:
+        if _expired(stop_at):
+            # Out of time: this level's implicants stand in for their primes
+            prime_values.append(values)
+            prime_masks.append(masks)
+            break
+        merged = np.zeros(values.size, dtype=bool)
+        new_keys = []
+        for b in range(num_vars):
+            bit = 1 << b
+            free = np.flatnonzero((masks & bit) == 0)
+            if free.size < 2:
+                continue
+            keys = (masks[free] << num_vars) | (values[free] & ~bit)
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+            # Cubes are unique, so a key is shared by at most two of them
+            pairs = np.flatnonzero(sorted_keys[1:] == sorted_keys[:-1])
+            if not pairs.size:
+                continue
+            merged[free[order[pairs]]] = True
+            merged[free[order[pairs + 1]]] = True
+            new_keys.append(sorted_keys[pairs] | (bit << num_vars))
+
+        prime_values.append(values[~merged])
+        prime_masks.append(masks[~merged])
+        if not new_keys:
+            break
+        keys = _sorted_unique(np.concatenate(new_keys))
+        masks = keys >> num_vars
+        values = keys & full
+
+    return set(zip(np.concatenate(prime_values).tolist(), np.concatenate(prime_masks).tolist()))
+
+
+def _cofactor_primes(job):
+    # (primes, complete); stop_at is a time.monotonic() value, which is
+    # system-wide, so it means the same in a worker process
+    terms, num_vars, stop_at = job
+    if not terms.size:
+        return set(), True
+    primes = numpy_prime_implicants(terms.tolist(), num_vars, stop_at)
+    return primes, not _expired(stop_at)
+
+
+SHARED_POOL_WORKERS = os.cpu_count() or 1
+_SHARED_POOL = None
+
+
+def shared_pool():
+    # One worker pool per process, started on first use (or by warm-up) and
+    # reused by every parallel solve instead of spawning workers each call.
+    # Workers are spawned, not forked: a multithreaded parent (e.g. an HTTP
+    # server) can fork a child holding a lock whose thread does not exist in
+    # it. Spawned workers re-import the main module, so the Streamlit app,
+    # whose page script is __main__, does not use this pool.
+    global _SHARED_POOL
+    if _SHARED_POOL is None:
+        _SHARED_POOL = ProcessPoolExecutor(max_workers=SHARED_POOL_WORKERS,
+                                           mp_context=multiprocessing.get_context('spawn'))
+    return _SHARED_POOL
+
+
+def in_worker_process():
+    # True inside a worker of some pool (service, batch, shared_pool): such a
+    # process must not start a pool of its own, or every worker would
+    return multiprocessing.parent_process() is not None
+
+
+def _parallel_engine(solver, terms, stop_at=None):
+    # In a worker the same cofactors are solved in-process instead
+    if in_worker_process():
+        return parallel_prime_implicants(terms, solver.num_vars, workers=1, stop_at=stop_at)
+    return parallel_prime_implicants(terms, solver.num_vars, pool=shared_pool(), stop_at=stop_at)
+
+
+def parallel_prime_implicants(terms, num_vars, split_vars=2, workers=None, pool=None, stop_at=None):
+    # Shannon expansion on the top split_vars variables. For a split variable
+    # x, the primes of F are x'p for primes p of F0, x p for primes of F1, and
+    # the primes of F0*F1 with x eliminated - the consensus cofactor, which is
+    # also what tells which primes of F0 / F1 still grow across x (exactly
+    # those that are primes of F0*F1 as well). Expanding every split variable
+    # gives 3^k independent cofactors, solved in worker processes and then
+    # folded back together one variable at a time. pool runs them on an
+    # existing executor (see shared_pool) instead of a fresh one.
+    split_vars = min(split_vars, num_vars - 1)
+    if split_vars < 1:
+        return numpy_prime_implicants(terms, num_vars, stop_at)
+    low_bits = num_vars - split_vars
+    all_terms = _sorted_unique(np.fromiter(terms, dtype=np.int64))
+    cofactors = [all_terms[(all_terms >> low_bits) == c] & ((1 << low_bits) - 1)
+                 for c in range(2**split_vars)]
+
+    # Cofactor of a pattern over {0, 1, *}: the AND of the matching cofactors
+    patterns = list(product('01*', repeat=split_vars))
+    jobs = []
+    for pattern in patterns:
+        matching = [cofactors[c] for c in range(2**split_vars)
+                    if all(p == '*' or int(p) == c >> (split_vars - 1 - j) & 1 for j, p in enumerate(pattern))]
+        leaf = matching[0]
+        for other in matching[1:]:
+            leaf = np.intersect1d(leaf, other, assume_unique=True)
+        jobs.append((leaf, low_bits, stop_at))
+
+    if workers == 1:
+        results = [_cofactor_primes(job) for job in jobs]
+    elif pool is not None:
+        results = list(pool.map(_cofactor_primes, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_cofactor_primes, jobs))
+    primes = dict(zip(("".join(p) for p in patterns), (r[0] for r in results)))
+    # A cofactor cut short may hold non-primes, so the fold cannot tell which
+    # cubes grow across x; it then keeps them all (still implicants of F)
+    complete = all(r[1] for r in results)
+
+    # Fold the deepest split variable first: a prefix of length j holds the
+    # primes over the remaining (split_vars - j) + low_bits variables
+    for depth in range(split_vars - 1, -1, -1):
+        x = 1 << (num_vars - 1 - depth)
+        folded = {}
+        for prefix in product('01*', repeat=depth):
+            prefix = "".join(prefix)
+            p0, p1, both = primes[prefix + '0'], primes[prefix + '1'], primes[prefix + '*']
+            merged = {(value, mask | x) for value, mask in both}
+            merged.update(cube for cube in p0 if not complete or cube not in both)
+            merged.update((value | x, mask) for value, mask in p1 if not complete or (value, mask) not in both)
+            folded[prefix] = merged
+        primes = folded
+    return primes['']
+
+
+# Prime implicant generators selectable through KMapSolver.solve(engine=...)
+PI_ENGINES = {
+    'python': lambda solver, terms, stop_at=None: solver._prime_implicants(terms, stop_at),
+    'numpy': lambda solver, terms, stop_at=None: numpy_prime_implicants(terms, solver.num_vars, stop_at),
+    'parallel': _parallel_engine,
+}
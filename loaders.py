@@ -0,0 +1,211 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+
+from kmap_logic import KMapSolver
+
+# File input for the solver page. Truth tables (CSV) and espresso PLA files
+# are parsed chunk by chunk straight into one int8 array per function, in the
+# layout of KMapSolver.get_output_array(): 1, 0, or -1 for a don't care,
+# indexed by minterm. Nothing per-row is kept in Python objects, so time and
+# memory follow the file size.
+
+MAX_VARS = 24
+CHUNK_ROWS = 1 << 16    # CSV rows per pandas chunk
+CHUNK_BYTES = 1 << 20   # PLA bytes per chunk
+IGNORED_COLUMNS = {'minterm', 'index'}
+OUTPUT_COLUMNS = {'output', 'out'}
+OUTPUT_VALUES = {'1': 1, '0': 0, 'X': -1, '-': -1, '2': -1}
+
+
+@contextlib.contextmanager
+def _text_stream(source):
+    # Accepts a path, bytes, a text stream or a binary stream (st.file_uploader).
+    # A file opened from a path is closed afterwards; a caller's stream is
+    # left open, including a binary one, which is detached from its wrapper.
+    if isinstance(source, (bytes, bytearray)):
+        yield io.StringIO(source.decode())
+    elif isinstance(source, str):
+        with open(source) as f:
+            yield f
+    elif isinstance(source, io.TextIOBase):
+        yield source
+    else:
+        wrapper = io.TextIOWrapper(source, encoding="utf-8")
+        try:
+            yield wrapper
+        finally:
+            wrapper.detach()
+
+
+def _empty_outputs(num_vars):
+    if not 1 <= num_vars <= MAX_VARS:
+        raise ValueError(f"Functions must have between 1 and {MAX_VARS} inputs, got {num_vars}")
+    return np.zeros(2**num_vars, dtype=np.int8)
+
+
+def parse_truth_table_csv(source):
+    # Returns (num_vars, outputs). One row per input combination: a 0/1 column
+    # per input (MSB first) and an output column of 0, 1 or X/-. A header row
+    # is optional; with one, a Minterm/Index column is ignored and the output
+    # column is the one named Output (or Out), otherwise the last.
+    # Rows may come in any order; combinations that are missing are 0.
+    with _text_stream(source) as stream:
+        return _read_truth_table(stream)
+
+
+def _read_truth_table(stream):
+    first = stream.readline()
+    stream.seek(0)
+    sep = ';' if ';' in first else ','
+    names = [name.strip().lower() for name in first.split(sep)]
+    # A data row is 0/1 inputs and a 0/1/X output; anything else is a header
+    has_header = not (all(n in ('0', '1') for n in names[:-1]) and names[-1] in ('0', '1', 'x', '-'))
+    columns = [i for i, name in enumerate(names) if not (has_header and name in IGNORED_COLUMNS)]
+    named = [i for i in columns if has_header and names[i] in OUTPUT_COLUMNS]
+    output_column = named[0] if named else columns[-1]
+    input_columns = [i for i in columns if i != output_column]
+    outputs = _empty_outputs(len(input_columns))
+    weights = 1 << np.arange(len(input_columns) - 1, -1, -1, dtype=np.int64)
+
+    # Inputs are parsed as int8 by the C parser; only the output stays text
+    dtypes = {i: np.int8 for i in input_columns}
+    dtypes[output_column] = str
+    reader = pd.read_csv(stream, header=0 if has_header else None, names=range(len(names)), sep=sep,
+                         usecols=input_columns + [output_column], dtype=dtypes,
+                         skipinitialspace=True, chunksize=CHUNK_ROWS)
+    rows_read = 0
+    for chunk in reader:
+        bits = chunk[input_columns].to_numpy()
+        if bits.size and (bits.min() < 0 or bits.max() > 1):
+            row = int(np.flatnonzero(((bits < 0) | (bits > 1)).any(axis=1))[0])
+            raise ValueError(f"Inputs must be 0 or 1 (row {rows_read + row + 1})")
+        index = bits.astype(np.int64) @ weights
+
+        values = chunk[output_column].str.strip().str.upper().map(OUTPUT_VALUES)
+        if values.isna().any():
+            row = int(np.flatnonzero(values.isna().to_numpy())[0])
+            raise ValueError(f"Output must be 0, 1 or X (row {rows_read + row + 1})")
+        outputs[index] = values.to_numpy(dtype=np.int8)
+        rows_read += len(chunk)
+
+    if rows_read == 0:
+        raise ValueError("The truth table is empty")
+    return len(input_columns), outputs
+
+
+def _expand_cubes(values, dashes, num_vars):
+    # Every minterm of every cube: each dashed input doubles its cubes' rows
+    for position in range(num_vars):
+        bit = np.int64(1) << position
+        free = (dashes & bit) != 0
+        if free.any():
+            values = np.concatenate([values, values[free] | bit])
+            dashes = np.concatenate([dashes, dashes[free]])
+    return values
+
+
+def parse_pla(source, output=0):
+    # Returns (num_vars, outputs) for one output of an espresso PLA file.
+    # Supports .i/.o/.type (f, fd, fr, fdr; default fd) and ignores other
+    # directives. Cube lines are an input part over 0/1/- and an output part;
+    # for this output '1' is on-set, '-'/'2' don't care and '0' off-set.
+    # Minterms no cube mentions are off for f/fd and don't care for fr/fdr.
+    # Reading stops at .e, so anything after it is never read.
+    with _text_stream(source) as stream:
+        return _read_pla(stream, output)
+
+
+def _read_pla(stream, output):
+    num_vars, num_outputs, pla_type = None, 1, 'fd'
+    outputs = None
+    pending = ""
+    ended = False
+    while not ended:
+        block = stream.read(CHUNK_BYTES)
+        text = pending + block
+        if block:
+            # Keep a partial last line for the next chunk
+            cut = text.rfind("\n") + 1
+            text, pending = text[:cut], text[cut:]
+        else:
+            pending = ""
+        if not text:
+            break
+
+        cube_lines = []
+        for line in text.splitlines():
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith("."):
+                parts = line.split()
+                if parts[0] == ".i":
+                    num_vars = int(parts[1])
+                elif parts[0] == ".o":
+                    num_outputs = int(parts[1])
+                elif parts[0] == ".type":
+                    pla_type = parts[1]
+                elif parts[0] == ".e":
+                    ended = True
+                    break
+                continue
+            cube_lines.append(line)
+        if not cube_lines:
+            continue
+
+        if outputs is None:
+            if num_vars is None:
+                raise ValueError("PLA file has no .i directive before its cubes")
+            if not 0 <= output < num_outputs:
+                raise ValueError(f"Output {output} does not exist, the file has {num_outputs}")
+            if pla_type not in ('f', 'fd', 'fr', 'fdr'):
+                raise ValueError(f"Unsupported PLA type '{pla_type}'")
+            outputs = _empty_outputs(num_vars)
+            if 'r' in pla_type:
+                outputs[:] = -1
+
+        # Fixed width once whitespace is gone: inputs, outputs, newline
+        width = num_vars + num_outputs
+        packed = "\n".join(cube_lines).translate({ord(" "): None, ord("\t"): None, ord("|"): None}) + "\n"
+        table = np.frombuffer(packed.encode(), dtype=np.uint8)
+        if table.size % (width + 1) or np.any(table[width::width + 1] != ord("\n")):
+            raise ValueError(f"Every cube must have {num_vars} inputs and {num_outputs} outputs")
+        table = table.reshape(-1, width + 1)
+        inputs = table[:, :num_vars]
+        if not np.isin(inputs, np.frombuffer(b"01-", dtype=np.uint8)).all():
+            raise ValueError("Cube inputs must be 0, 1 or -")
+        weights = np.int64(1) << np.arange(num_vars - 1, -1, -1, dtype=np.int64)
+        values = (inputs == ord("1")).astype(np.int64) @ weights
+        dashes = (inputs == ord("-")).astype(np.int64) @ weights
+
+        # Later sets win where cubes overlap: don't cares, then on-set, then
+        # the off-set (only listed explicitly for fr/fdr)
+        column = table[:, num_vars + output]
+        for symbols, value in ((b"-2", -1), (b"1", 1), (b"0~", 0)):
+            if value == 0 and 'r' not in pla_type:
+                continue
+            rows = np.isin(column, np.frombuffer(symbols, dtype=np.uint8))
+            if rows.any():
+                outputs[_expand_cubes(values[rows], dashes[rows], num_vars)] = value
+
+    if outputs is None:
+        raise ValueError("The PLA file has no cubes")
+    return num_vars, outputs
+
+
+def load_function(source, name):
+    # Dispatch on the file extension, as st.file_uploader reports it
+    if name.lower().endswith(".pla"):
+        return parse_pla(source)
+    return parse_truth_table_csv(source)
+
+
+def solver_from_outputs(outputs, mode='SOP'):
+    # KMapSolver for an outputs array; in POS mode the zeros are the targets
+    num_vars = int(np.log2(outputs.size))
+    targets = np.flatnonzero(outputs == (0 if mode == 'POS' else 1)).tolist()
+    dont_cares = np.flatnonzero(outputs == -1).tolist()
+    return KMapSolver(num_vars, targets, dont_cares, mode=mode)
@@ -0,0 +1,101 @@
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+
+# Load test for service.py: fires random K-map problems at /solve from a
+# number of client threads and reports throughput and latency percentiles.
+# A share of the requests repeats earlier problems to exercise coalescing.
+
+
+def _problem(rng, num_vars):
+    terms = list(range(2**num_vars))
+    rng.shuffle(terms)
+    num_on = rng.randint(1, len(terms) // 2)
+    num_dc = rng.randint(0, len(terms) // 8)
+    return {'num_vars': num_vars, 'minterms': terms[:num_on],
+            'dont_cares': terms[num_on:num_on + num_dc], 'mode': rng.choice(['SOP', 'POS'])}
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def run(url, requests, concurrency, num_vars, repeat_share, seed=0):
+    rng = random.Random(seed)
+    pool = [_problem(rng, num_vars) for _ in range(max(1, int(requests * (1 - repeat_share))))]
+    problems = [rng.choice(pool) for _ in range(requests)]
+
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    next_index = [0]
+
+    def client():
+        while True:
+            with lock:
+                if next_index[0] >= len(problems):
+                    return
+                problem = problems[next_index[0]]
+                next_index[0] += 1
+            body = json.dumps(problem).encode()
+            request = urllib.request.Request(url + "/solve", data=body,
+                                             headers={"Content-Type": "application/json"})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            elapsed = time.perf_counter() - start
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'seconds': wall,
+        'throughput': requests / wall if wall else 0.0,
+        'p50_ms': _percentile(latencies, 0.50) * 1000,
+        'p99_ms': _percentile(latencies, 0.99) * 1000,
+        'statuses': statuses,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the LogicMap solver service.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--num-vars", type=int, default=6)
+    parser.add_argument("--repeat-share", type=float, default=0.3,
+                        help="fraction of requests that repeat an earlier problem")
+    args = parser.parse_args(argv)
+
+    report = run(args.url, args.requests, args.concurrency, args.num_vars, args.repeat_share)
+    print(f"{report['requests']} requests in {report['seconds']:.2f}s "
+          f"({report['throughput']:.1f} req/s)")
+    print(f"latency p50 {report['p50_ms']:.1f} ms, p99 {report['p99_ms']:.1f} ms")
+    print(f"status codes: {report['statuses']}")
+    with urllib.request.urlopen(args.url + "/health") as response:
+        print(f"service: {json.loads(response.read())}")
+
+
+if __name__ == "__main__":
+    main()
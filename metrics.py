@@ -0,0 +1,241 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Process-wide operational metrics for the app (and anything else that imports
+# this module). Recording is a dict update under a lock, a few microseconds,
+# so it stays far below 1% of even the smallest solve. Metrics are exposed in
+# the Prometheus text format, through a textfile for node_exporter's textfile
+# collector and/or a local /metrics endpoint:
+#   LOGICMAP_METRICS_PORT=9108        serve http://127.0.0.1:9108/metrics
+#                                     (and /ready, 200 once warm-up is done)
+#   LOGICMAP_METRICS_FILE=/path.prom  rewrite the file every EXPORT_INTERVAL
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FRAME_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+SESSION_TIMEOUT = 300.0  # seconds without a rerun before a session stops counting as active
+EXPORT_INTERVAL = 15.0   # seconds between textfile rewrites
+
+HELP = {
+    'logicmap_solve_seconds': "Solver time per solve, by number of variables",
+    'logicmap_render_seconds': "Time to draw and push one K-map frame",
+    'logicmap_animation_frames': "Frames rendered per solver page run",
+    'logicmap_cache_requests_total': "Cache lookups by cache and result (hit/miss)",
+    'logicmap_active_sessions': "Sessions with a rerun in the last SESSION_TIMEOUT seconds",
+    'process_resident_memory_bytes': "Resident set size of this process",
+    'logicmap_ready': "1 once the process warm-up has finished",
+    'logicmap_warm_up_seconds': "Duration of the process warm-up",
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def resident_memory_bytes():
+    # Current RSS from /proc on Linux, peak RSS from getrusage elsewhere
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}  # name -> {label key: [bucket counts, sum, count]}
+        self.counters = {}    # name -> {label key: value}
+        self.gauges = {}      # name -> value
+        self.sessions = {}    # session id -> last seen (monotonic)
+
+    def observe(self, name, value, **labels):
+        buckets = FRAME_BUCKETS if name == 'logicmap_animation_frames' else SECONDS_BUCKETS
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            entry = series.get(_label_key(labels))
+            if entry is None:
+                entry = series[_label_key(labels)] = [[0] * len(buckets), 0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def inc(self, name, amount=1, **labels):
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed_iter(self, iterable, name, **labels):
+        # Yields from iterable, observing only the time spent producing items
+        # (not the time the consumer spends between them)
+        elapsed = 0.0
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                elapsed += time.perf_counter() - start
+                break
+            elapsed += time.perf_counter() - start
+            yield item
+        self.observe(name, elapsed, **labels)
+
+    def set_gauge(self, name, value):
+        with self.lock:
+            self.gauges[name] = value
+
+    def cache(self, cache, hit):
+        self.inc('logicmap_cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+    def touch_session(self, session_id):
+        with self.lock:
+            self.sessions[session_id] = time.monotonic()
+
+    def active_sessions(self):
+        cutoff = time.monotonic() - SESSION_TIMEOUT
+        with self.lock:
+            for session_id in [s for s, seen in self.sessions.items() if seen < cutoff]:
+                del self.sessions[session_id]
+            return len(self.sessions)
+
+    def snapshot(self):
+        # Summary for the admin panel: means, totals and hit rates
+        active = self.active_sessions()
+        with self.lock:
+            histograms = {name: {key: (entry[1], entry[2]) for key, entry in series.items()}
+                          for name, series in self.histograms.items()}
+            counters = {name: dict(series) for name, series in self.counters.items()}
+        solve = {dict(key).get('num_vars'): (total / count, count)
+                 for key, (total, count) in histograms.get('logicmap_solve_seconds', {}).items()}
+        hit_rates = {}
+        for key, value in counters.get('logicmap_cache_requests_total', {}).items():
+            labels = dict(key)
+            hits, total = hit_rates.get(labels['cache'], (0, 0))
+            hit_rates[labels['cache']] = (hits + (value if labels['result'] == 'hit' else 0), total + value)
+
+        def mean(name):
+            entries = histograms.get(name, {}).values()
+            count = sum(c for _, c in entries)
+            return sum(t for t, _ in entries) / count if count else 0.0
+
+        return {
+            'solve_seconds': dict(sorted(solve.items(), key=lambda item: int(item[0]))),
+            'render_seconds': mean('logicmap_render_seconds'),
+            'frames_per_animation': mean('logicmap_animation_frames'),
+            'cache_hit_rate': {cache: hits / total for cache, (hits, total) in hit_rates.items() if total},
+            'active_sessions': active,
+            'rss_bytes': resident_memory_bytes(),
+        }
+
+    def render_prometheus(self):
+        active = self.active_sessions()
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.histograms.items()):
+                buckets = FRAME_BUCKETS if name == 'logicmap_animation_frames' else SECONDS_BUCKETS
+                lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} histogram"]
+                for key, (counts, total, count) in sorted(series.items()):
+                    cumulative = 0
+                    for bound, n in zip(buckets, counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {total:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {count}")
+            for name, series in sorted(self.counters.items()):
+                lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} counter"]
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            gauges = sorted(self.gauges.items())
+        gauges += [('logicmap_active_sessions', active),
+                   ('process_resident_memory_bytes', resident_memory_bytes())]
+        for name, value in gauges:
+            lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        # Atomic replace, so the collector never reads a half-written file
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+
+METRICS = Metrics()
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            status, body = 200, METRICS.render_prometheus().encode()
+        elif self.path == "/ready":
+            ready = METRICS.gauges.get('logicmap_ready') == 1
+            status, body = (200, b"ready\n") if ready else (503, b"warming up\n")
+        else:
+            self.send_error(404)
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve_metrics(port, host="127.0.0.1"):
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _textfile_loop(path):
+    while True:
+        try:
+            METRICS.write_textfile(path)
+        except OSError:
+            pass
+        time.sleep(EXPORT_INTERVAL)
+
+
+def start_exporters():
+    # Starts the exporters configured in the environment, once per process
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    port = os.environ.get("LOGICMAP_METRICS_PORT")
+    if port:
+        serve_metrics(int(port))
+    path = os.environ.get("LOGICMAP_METRICS_FILE")
+    if path:
+        threading.Thread(target=_textfile_loop, args=(path,), daemon=True).start()
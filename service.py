@@ -0,0 +1,257 @@
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from backends import BACKENDS
+from kmap_logic import KMapSolver, PI_ENGINES
+
+# Local JSON minimization service in front of KMapSolver (stdlib only).
+#
+#   POST /solve   {"num_vars": 4, "minterms": [...], "dont_cares": [...],
+#                  "mode": "SOP", "engine": "python", "backend": "auto",
+#                  "deadline": 2.0}
+#                 mode "BEST" takes minterms as the on-set, solves both forms
+#                 and answers with the cheaper one (see solve_dual)
+#   POST /batch   {"problems": [<problem>, ...]}
+#   GET  /health  pool and queue statistics
+#
+# Solves run in a bounded process pool. Identical problems in flight at the
+# same time share one solve, and when more than workers + queue distinct
+# solves are pending, new ones are turned away with 503 + Retry-After.
+# Every solve runs under a deadline, MAX_DEADLINE unless the request asks for
+# less, so a worker is never tied up far beyond the request waiting for it.
+
+MAX_VARS = 20
+REQUEST_TIMEOUT = 60.0  # seconds a request waits for its result
+MAX_DEADLINE = 30.0     # solve budget when a request names none, and its cap
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+def _problem_key(problem):
+    # Canonical form of a request, used for coalescing and as the worker job
+    if not isinstance(problem, dict):
+        raise ValueError("Problem must be a JSON object")
+    num_vars = problem.get('num_vars')
+    if not isinstance(num_vars, int) or not 1 <= num_vars <= MAX_VARS:
+        raise ValueError(f"num_vars must be an integer between 1 and {MAX_VARS}")
+    mode = problem.get('mode', 'SOP')
+    if mode not in ('SOP', 'POS', 'BEST'):
+        raise ValueError("mode must be 'SOP', 'POS' or 'BEST'")
+    engine = problem.get('engine', 'python')
+    if engine not in PI_ENGINES:
+        raise ValueError(f"engine must be one of {sorted(PI_ENGINES)}")
+    backend = problem.get('backend')
+    if backend is not None and backend != 'auto' and backend not in BACKENDS:
+        raise ValueError(f"backend must be 'auto' or one of {sorted(BACKENDS)}")
+    deadline = problem.get('deadline')
+    if deadline is None:
+        deadline = MAX_DEADLINE
+    elif isinstance(deadline, bool) or not isinstance(deadline, (int, float)) or not deadline >= 0:
+        raise ValueError("deadline must be a non-negative number of seconds")
+    deadline = min(deadline, MAX_DEADLINE)
+    try:
+        minterms = tuple(sorted({int(m) for m in problem.get('minterms', [])}))
+        dont_cares = tuple(sorted({int(d) for d in problem.get('dont_cares', [])}))
+    except (TypeError, ValueError):
+        raise ValueError("minterms and dont_cares must be lists of integers")
+    if set(minterms) & set(dont_cares):
+        raise ValueError("A term cannot be both a minterm and a don't care")
+    # Validates term ranges up front so bad requests never reach the pool
+    KMapSolver(num_vars, minterms, dont_cares)
+    return (num_vars, minterms, dont_cares, mode, engine, backend, deadline)
+
+
+def _solve_job(key):
+    num_vars, minterms, dont_cares, mode, engine, backend, deadline = key
+    if mode == 'BEST':
+        dual = KMapSolver(num_vars, minterms, dont_cares).solve_dual(engine, deadline, backend)
+        best = dual[dual['cheaper']]
+        return {
+            'equation': best['equation'],
+            'terms': best['logic_parts'],
+            'cubes': [g.to_bin() for g in best['groups']],
+            'proven_minimal': best['proven_minimal'],
+            'backend': backend or engine,
+            'mode': dual['cheaper'],
+            'costs': {form: {'terms': dual[form]['terms'], 'literals': dual[form]['literals']}
+                      for form in ('SOP', 'POS')},
+        }
+    solver = KMapSolver(num_vars, minterms, dont_cares, mode)
+    equation, logic_parts, groups = solver.solve(engine=engine, deadline=deadline, backend=backend)
+    return {
+        'equation': equation,
+        'terms': logic_parts,
+        'cubes': [g.to_bin() for g in groups],
+        'proven_minimal': solver.proven_minimal,
+        'backend': solver.backend,
+    }
+
+
+class MinimizationService:
+    def __init__(self, workers=None, queue_size=64):
+        self.workers = workers or os.cpu_count() or 1
+        self.capacity = self.workers + queue_size
+        self.pool = self._new_pool()
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.stats = {'requests': 0, 'solves': 0, 'coalesced': 0, 'rejected': 0, 'pool_restarts': 0}
+
+    def _new_pool(self):
+        # Spawned workers start clean instead of inheriting the server's
+        # threads and locks mid-request
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def submit(self, problem):
+        # Returns a future for the problem's result, joining an identical
+        # in-flight solve if there is one. Raises ValueError for a malformed
+        # problem and ServiceBusy when the queue is full.
+        key = _problem_key(problem)
+        with self.lock:
+            self.stats['requests'] += 1
+            future = self.in_flight.get(key)
+            if future is not None:
+                self.stats['coalesced'] += 1
+                return future
+            if len(self.in_flight) >= self.capacity:
+                self.stats['rejected'] += 1
+                raise ServiceBusy()
+            try:
+                future = self.pool.submit(_solve_job, key)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); its solves have
+                # already failed, so replace the pool and carry on
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = self._new_pool()
+                self.stats['pool_restarts'] += 1
+                future = self.pool.submit(_solve_job, key)
+            self.in_flight[key] = future
+            self.stats['solves'] += 1
+        future.add_done_callback(lambda f: self._finished(key, f))
+        return future
+
+    def _finished(self, key, future):
+        with self.lock:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+
+    def health(self):
+        with self.lock:
+            return dict(self.stats, workers=self.workers, capacity=self.capacity,
+                        in_flight=len(self.in_flight))
+
+    def shutdown(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None  # set by make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._reply(200, self.service.health())
+        else:
+            self._reply(404, {'error': "Not found"})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            self._reply(400, {'error': "Body must be JSON"})
+            return
+
+        if self.path == "/solve":
+            try:
+                future = self.service.submit(request)
+            except ValueError as e:
+                self._reply(400, {'error': str(e)})
+                return
+            except ServiceBusy:
+                self._reply(503, {'error': "Solver queue is full"}, {"Retry-After": "1"})
+                return
+            try:
+                self._reply(200, future.result(timeout=REQUEST_TIMEOUT))
+            except TimeoutError:
+                self._reply(504, {'error': "Solve timed out"})
+            except Exception as e:  # a failed solve or a dead worker
+                self._reply(500, {'error': f"Solve failed: {type(e).__name__}: {e}"})
+        elif self.path == "/batch":
+            problems = request.get('problems') if isinstance(request, dict) else None
+            if not isinstance(problems, list):
+                self._reply(400, {'error': "Expected {\"problems\": [...]}"})
+                return
+            # Submit everything first so the batch fills the pool, then collect
+            pending = []
+            for problem in problems:
+                try:
+                    pending.append(self.service.submit(problem))
+                except ValueError as e:
+                    pending.append({'error': str(e)})
+                except ServiceBusy:
+                    pending.append({'error': "Solver queue is full"})
+            results = []
+            for item in pending:
+                if isinstance(item, dict):
+                    results.append(item)
+                    continue
+                try:
+                    results.append(item.result(timeout=REQUEST_TIMEOUT))
+                except TimeoutError:
+                    results.append({'error': "Solve timed out"})
+                except Exception as e:
+                    results.append({'error': f"Solve failed: {type(e).__name__}: {e}"})
+            self._reply(200, {'results': results})
+        else:
+            self._reply(404, {'error': "Not found"})
+
+
+def make_server(host="127.0.0.1", port=8765, workers=None, queue_size=64):
+    service = MinimizationService(workers, queue_size)
+    handler = type("Handler", (_Handler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, service
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve KMapSolver over HTTP/JSON on localhost.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="solver processes (default: CPU count)")
+    parser.add_argument("--queue", type=int, default=64, help="pending solves allowed beyond the workers")
+    args = parser.parse_args(argv)
+
+    server, service = make_server(args.host, args.port, args.workers, args.queue)
+    print(f"LogicMap solver service on http://{args.host}:{server.server_port} ({service.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
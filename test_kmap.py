@@ -1,6 +1,17 @@
-from kmap_logic import KMapSolver
-from visualizer import KMapVisualizer
+from kmap_logic import KMapSolver, Cube, numpy_prime_implicants, parallel_prime_implicants
+from visualizer import KMapVisualizer, grid_layout
 import matplotlib.pyplot as plt
+from decompose import or_partition, reduce_support, solve_decomposed
+from export import export_problems
+from batch import merge_shards, plan_shards, run_batch
+from backends import BACKENDS, capable_backends, select_backend
+from bdd import BDD, format_cover, solve_bdd
+from loaders import parse_pla, parse_truth_table_csv, solver_from_outputs
+from metrics import Metrics
+from warmup import readiness, warm_up
+from service import MinimizationService, ServiceBusy, make_server
+from concurrent.futures.process import BrokenProcessPool
+from verify import check_equivalence, check_solver, parse_expression
 
 def test_solver():
     print("Testing Solver...")
@@ -25,6 +36,128 @@ def test_solver():
         print("Solver Logic Passed!")
     else:
         print("Solver Logic Check Failed (Visual inspection needed)")
+    assert check_solver(solver, (eq, parts, groups))['equivalent']
+
+def test_cube_coverage():
+    # -0-0 over A,B,C,D: value 0, mask 0b1010
+    cube = Cube(0, 0b1010, 4)
+    assert cube.to_bin() == "-0-0"
+    assert len(cube) == 4
+    assert list(cube) == [0, 2, 8, 10]
+    assert 10 in cube and 1 not in cube
+    assert cube == [10, 8, 2, 0]
+
+def test_numpy_engine_matches_python():
+    minterms = [0, 1, 5, 7, 8, 9, 13, 15, 21, 30, 31]
+    dont_cares = [3, 11, 23]
+    solver = KMapSolver(5, minterms, dont_cares)
+    terms = set(minterms) | set(dont_cares)
+    assert numpy_prime_implicants(terms, 5) == solver._prime_implicants(terms)
+    eq, parts, groups = solver.solve(engine='numpy')
+    covered = set().union(*map(set, groups))
+    assert set(minterms) <= covered <= terms
+
+def test_parallel_engine_matches_numpy():
+    terms = {0, 1, 3, 4, 5, 7, 9, 12, 13, 15, 18, 22, 26, 31, 33, 40, 45, 47, 50, 55, 60, 63}
+    expected = numpy_prime_implicants(terms, 6)
+    for split_vars in (1, 2, 3):
+        assert parallel_prime_implicants(terms, 6, split_vars, workers=1) == expected
+    assert parallel_prime_implicants(terms, 6, 2, workers=2) == expected
+
+def test_iter_minimal_covers():
+    # Cyclic function with exactly two minimum covers
+    solver = KMapSolver(3, [0, 1, 2, 5, 6, 7], [])
+    covers = list(solver.iter_minimal_covers())
+    assert sorted(eq for eq, parts, groups in covers) == ["A'B' + BC' + AC", "A'C' + B'C + AB"]
+    assert len(list(solver.iter_minimal_covers(limit=1))) == 1
+    # After a solve the covers come from its chart, without new prime generation
+    solver = KMapSolver(3, [0, 1, 2, 5, 6, 7], [])
+    solver.solve()
+    def no_primes(*args):
+        raise AssertionError("primes regenerated")
+    solver._generate_primes = no_primes
+    assert len(list(solver.iter_minimal_covers())) == 2
+
+def test_solve_deadline_refines_greedy():
+    solver = KMapSolver(3, [0, 1, 2, 5, 6, 7], [])
+    solver.solve()
+    assert not solver.proven_minimal
+    eq, parts, groups = solver.solve(deadline=5)
+    assert solver.proven_minimal
+    assert len(parts) == 3
+
+def test_verify_all_three_variable_functions():
+    for f in range(256):
+        minterms = [i for i in range(8) if f >> i & 1]
+        for mode in ('SOP', 'POS'):
+            result = check_solver(KMapSolver(3, minterms, [], mode))
+            assert result['equivalent'], (minterms, mode, result)
+
+def test_verify_reports_mismatches():
+    assert parse_expression("(A+B')(C)", 3, 'POS') == [(0b010, 0b001), (0b000, 0b110)]
+    result = check_equivalence(4, [0, 2, 8, 10], [], "B'D' + A")
+    assert result['mismatches'] == [9, 11, 12, 13, 14, 15]
+    # Don't cares may take either value
+    assert check_equivalence(4, [0, 2, 8], [10], "B'D'")['equivalent']
+    # Random simulation mode
+    assert check_equivalence(30, [0], [], [(0, (1 << 29) - 1)], samples=4096)['mismatches'] != []
+
+def test_trace_events():
+    solver = KMapSolver(4, [0, 1, 5, 7, 8, 9, 13, 15], [3, 11])
+    events = list(solver.trace())
+    kinds = [e['event'] for e in events]
+    assert kinds[-1] == 'result'
+    assert kinds.count('combine_round') == 4
+    assert sorted(e['term'] for e in events if e['event'] == 'essential') == ["B'C'", "D"]
+    assert events[-1]['equation'] == solver.solve()[0]
+
+def test_truth_table_window():
+    solver = KMapSolver(4, [0, 1, 5], [3, 11], mode='POS')
+    outputs = solver.get_output_array()
+    assert outputs[[0, 3, 2]].tolist() == [0, -1, 1]
+    page = solver.truth_table_rows([3, 5], outputs)
+    assert page['Minterm'].tolist() == [3, 5]
+    assert page['Output'].tolist() == ['X', 0]
+    assert page[['A', 'B', 'C', 'D']].values.tolist() == [[0, 0, 1, 1], [0, 1, 0, 1]]
+    assert len(solver.get_truth_table()) == 16
+
+def test_reduce_support():
+    # F = B'D' ignores A and C
+    kept, targets, dont_cares, exact = reduce_support(4, {0, 2, 8, 10}, set())
+    assert kept == [1, 3] and targets == {0} and exact
+    # With 5 as a don't care, F = B ignores A, C and D
+    kept, targets, dont_cares, exact = reduce_support(4, {4, 6, 7, 12, 13, 14, 15}, {5})
+    assert kept == [1] and targets == {1} and not exact
+
+def test_solve_decomposed():
+    # Two cyclic 3-variable functions on disjoint variables, plus an unused G
+    cyclic = {0, 1, 2, 5, 6, 7}
+    minterms = [x for x in range(128) if (x >> 4) in cyclic or (x >> 1) & 7 in cyclic]
+    solver = KMapSolver(7, minterms, [])
+    result = solve_decomposed(solver, deadline=10)
+    assert solver.proven_minimal
+    assert len(result[1]) == 6
+    assert "G" not in result[0]
+    assert check_solver(solver, result)['equivalent']
+    # The split is read off the truth table, before any prime is generated
+    kept, targets, _, _ = reduce_support(7, set(minterms), set())
+    parts = or_partition(len(kept), targets)
+    assert [positions for positions, _ in parts] == [[0, 1, 2], [3, 4, 5]]
+    assert all(part_targets == cyclic for _, part_targets in parts)
+    assert or_partition(3, cyclic) is None
+    # Without a deadline the greedy cover is not claimed minimal
+    solver = KMapSolver(4, [5, 7, 8, 9, 10, 11, 12, 14, 15], [])
+    solve_decomposed(solver)
+    assert not solver.proven_minimal
+
+def test_warm_up():
+    warm_up(background=False)
+    state = readiness()
+    assert state['ready'] and state['error'] is None
+    assert set(state['steps']) == {'layouts', 'rendering', 'solvers'}
+    # Gray-code coordinate map: rows AB, columns CD in 00 01 11 10 order
+    assert grid_layout(4)['coords'][11] == (3, 2) and grid_layout(3)['coords'][6] == (1, 3)
+    assert KMapVisualizer(4, [], [], []).coords is grid_layout(4)['coords']
 
 def test_visualizer():
     print("Testing Visualizer...")
@@ -38,6 +171,260 @@ def test_visualizer():
     except Exception as e:
         print(f"Visualizer Failed: {e}")
 
+def test_export_problems(tmp_path):
+    problems = [
+        {"name": "corners", "num_vars": 4, "minterms": [0, 2, 8, 10]},
+        {"num_vars": 3, "minterms": [1, 3], "dont_cares": [5], "mode": "POS"},
+    ]
+    results = export_problems(problems, str(tmp_path), fmt='png', steps=True, workers=1)
+    assert results[0]['equation'] == "B'D'"
+    assert [len(r['files']) for r in results] == [4, 4]
+    results = export_problems(problems, str(tmp_path), fmt='pdf', workers=1)
+    assert (tmp_path / "corners.pdf").exists() and (tmp_path / "kmap_0001.pdf").exists()
+    # Names stay inside out_dir and never overwrite each other
+    out = tmp_path / "out"
+    named = [dict(problems[0], name=name) for name in ("../escape", "Corners", "corners", "")]
+    results = export_problems(named, str(out), fmt='png', workers=1)
+    assert [r['name'] for r in results] == ["escape", "Corners", "corners_2", "kmap_0003"]
+    assert sorted(p.name for p in out.iterdir()) == \
+        ["Corners.png", "corners_2.png", "escape.png", "kmap_0003.png"]
+    # The growing step figure matches drawing every frame from scratch
+    import numpy as np
+    visualizer = KMapVisualizer(4, [0, 2, 5, 7], [8], KMapSolver(4, [0, 2, 5, 7], [8]).solve()[2], 'light')
+    for kwargs, fig in zip(visualizer.frames(), visualizer.frame_figures()):
+        fresh = visualizer.draw(**kwargs)
+        fig.canvas.draw()
+        fresh.canvas.draw()
+        assert np.array_equal(np.asarray(fig.canvas.buffer_rgba()), np.asarray(fresh.canvas.buffer_rgba()))
+        plt.close(fresh)
+    plt.close(fig)
+
+def test_backend_selection():
+    solver = KMapSolver(4, [0, 1, 2, 5, 8, 9, 10], [], mode='SOP')
+    for name in BACKENDS:
+        result = solver.solve(backend=name)
+        assert solver.backend == name and check_solver(solver, result)['equivalent']
+    solver.solve(backend='auto')
+    assert solver.backend == select_backend(4, 7 / 16)
+    solver.solve(engine='numpy')
+    assert solver.backend == 'numpy'
+    # Wide functions only go to backends without a variable limit
+    assert select_backend(40, 0.01) in [n for n, caps in BACKENDS.items() if caps['max_vars'] is None]
+    assert BACKENDS[select_backend(10, 0.5, exact=True)]['exact']
+    # No extrapolation past the calibrated sizes, no pooled backend in a worker
+    assert select_backend(14, 0.4) == 'numpy'
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        assert 'parallel' in capable_backends(10)
+        assert 'parallel' not in pool.submit(capable_backends, 10).result()
+
+def test_bdd_cover_and_stats():
+    solver = KMapSolver(4, [0, 1, 2, 5, 8, 9, 10], [], mode='SOP')
+    assert check_solver(solver, solve_bdd(solver))['equivalent']
+    # One cube, but with don't cares a prime with fewer literals may exist
+    solver = KMapSolver(4, [5], [1, 2, 4, 6, 7, 8, 10, 13], mode='SOP')
+    solve_bdd(solver)
+    assert not solver.proven_minimal
+    # 40 inputs: AB + CD + ... as 20 disjoint pairs, linear in the natural order
+    n = 40
+    full = (1 << n) - 1
+    pairs = [(3 << (n - 2 - i), full & ~(3 << (n - 2 - i))) for i in range(0, n, 2)]
+    manager = BDD(n)
+    f = manager.from_cubes(pairs)
+    stats = manager.stats(f)
+    assert stats['support'] == list(range(n)) and stats['nodes'] == n
+    assert stats['on_set'] == 2**n - 3**(n // 2)
+    cover = manager.cover(f)
+    assert sorted((c.value, c.mask) for c in cover) == sorted(pairs)
+    assert manager.from_expression(format_cover(cover, n)[0]) == f
+    small = BDD(12, order=list(range(0, 12, 2)) + list(range(1, 12, 2)))
+    g = small.from_cubes([(3 << (10 - i), 4095 & ~(3 << (10 - i))) for i in range(0, 12, 2)])
+    before = small.size([g])
+    g, = small.sift([g])
+    assert small.size([g]) == 12 < before
+    assert small.sat_count(g) == 2**12 - 3**6
+
+def test_truth_table_and_pla_loaders(tmp_path, monkeypatch):
+    import io, time
+    import numpy as np
+    csv = "A,B,C,Output,Minterm\n1,1,1,1,7\n0,0,0,1,0\n0,0,1,x,1\n1,0,0,0,4\n"
+    num_vars, outputs = parse_truth_table_csv(io.BytesIO(csv.encode()))
+    assert num_vars == 3 and outputs.tolist() == [1, -1, 0, 0, 0, 0, 0, 1]
+    pla = ".i 4\n.o 2\n.ilb a b c d\n1-0- 10\n-11- 01\n0000 -1\n.e\n"
+    num_vars, outputs = parse_pla(io.BytesIO(pla.encode()), output=0)
+    assert np.flatnonzero(outputs == 1).tolist() == [8, 9, 12, 13] and outputs[0] == -1
+    solver = solver_from_outputs(outputs, mode='POS')
+    assert check_solver(solver)['equivalent']
+    # Reading stops at .e, even when what follows it is in a later chunk;
+    # a caller's stream stays open and a file opened from a path is closed
+    import loaders
+    monkeypatch.setattr(loaders, 'CHUNK_BYTES', 16)
+    stream = io.BytesIO((pla + "not a cube\n" * 100).encode())
+    assert (parse_pla(stream)[1] == outputs).all() and not stream.closed
+    path = tmp_path / "f.pla"
+    path.write_text(pla)
+    opened = []
+    monkeypatch.setattr(loaders, 'open', lambda *args: opened.append(open(*args)) or opened[-1], raising=False)
+    assert (parse_pla(str(path))[1] == outputs).all() and opened[0].closed
+    # 2^16-row truth table, rows shuffled, parsed well under a second
+    n = 16
+    expected = np.random.default_rng(0).choice(np.array([0, 1, -1], dtype=np.int8), size=2**n)
+    order = np.random.default_rng(1).permutation(2**n)
+    bits = (order[:, None] >> np.arange(n - 1, -1, -1)) & 1
+    symbols = np.array(['0', '1', 'X'])[expected[order]]
+    lines = [",".join(map(str, row)) + "," + s for row, s in zip(bits.tolist(), symbols)]
+    data = "\n".join(lines).encode()
+    start = time.perf_counter()
+    num_vars, outputs = parse_truth_table_csv(io.BytesIO(data))
+    assert time.perf_counter() - start < 1.0
+    assert num_vars == n and (outputs == expected).all()
+
+def test_metrics_exposition(tmp_path):
+    metrics = Metrics()
+    solver = KMapSolver(4, [0, 2, 8, 10], [], mode='SOP')
+    events = list(metrics.timed_iter(solver.trace(), 'logicmap_solve_seconds', num_vars=4))
+    assert events[-1]['equation'] == "B'D'"
+    metrics.cache('solution', hit=False)
+    metrics.cache('solution', hit=True)
+    metrics.observe('logicmap_animation_frames', 12)
+    metrics.touch_session("a")
+    stats = metrics.snapshot()
+    assert stats['cache_hit_rate'] == {'solution': 0.5} and stats['active_sessions'] == 1
+    assert stats['solve_seconds']['4'][1] == 1 and stats['frames_per_animation'] == 12
+    text = metrics.render_prometheus()
+    assert 'logicmap_solve_seconds_count{num_vars="4"} 1' in text
+    assert 'logicmap_animation_frames_bucket{le="20"} 1' in text
+    assert 'logicmap_cache_requests_total{cache="solution",result="hit"} 1' in text
+    metrics.write_textfile(str(tmp_path / "logicmap.prom"))
+    assert (tmp_path / "logicmap.prom").read_text().startswith("# HELP")
+
+def test_service_coalesces_and_sheds_load():
+    service = MinimizationService(workers=1, queue_size=0)
+    try:
+        problem = {"num_vars": 4, "minterms": [0, 2, 8, 10]}
+        first = service.submit(problem)
+        # Same problem with terms reordered joins the in-flight solve
+        assert service.submit({"num_vars": 4, "minterms": [10, 8, 2, 0]}) is first
+        try:
+            service.submit({"num_vars": 3, "minterms": [1]})
+            assert False, "expected ServiceBusy"
+        except ServiceBusy:
+            pass
+        assert first.result(timeout=30)['equation'] == "B'D'"
+        try:
+            service.submit({"num_vars": 2, "minterms": [7]})
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+        for deadline in (True, -1, "2"):
+            try:
+                service.submit({"num_vars": 2, "minterms": [1], "deadline": deadline})
+                assert False, "expected ValueError"
+            except ValueError:
+                pass
+        assert service.health()['coalesced'] == 1
+        # A dead worker breaks the pool: the solve caught in it fails and the
+        # service replaces the pool
+        for process in list(service.pool._processes.values()):
+            process.kill()
+            process.join()
+        try:
+            service.submit({"num_vars": 5, "minterms": [1, 3]}).result(timeout=30)
+        except BrokenProcessPool:
+            pass
+        assert service.submit({"num_vars": 3, "minterms": [1]}).result(timeout=30)['equation'] == "A'B'C"
+        assert service.health()['pool_restarts'] == 1
+    finally:
+        service.shutdown()
+
+def test_service_http():
+    import json, threading, urllib.request
+    server, service = make_server(port=0, workers=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/batch"
+        body = json.dumps({"problems": [{"num_vars": 3, "minterms": [1, 3], "mode": "POS"}, {"num_vars": 0}]})
+        with urllib.request.urlopen(urllib.request.Request(url, data=body.encode())) as response:
+            results = json.loads(response.read())['results']
+        assert check_equivalence(3, [1, 3], [], results[0]['equation'], 'POS')['equivalent']
+        assert 'error' in results[1]
+    finally:
+        server.shutdown()
+        service.shutdown()
+
+def test_batch_shards_resume_and_merge(tmp_path):
+    import json, os
+    problems = [{"num_vars": 3, "minterms": [i, (i * 3) % 8], "name": f"p{i}"} for i in range(10)]
+    problems[4] = {"num_vars": 2, "minterms": [9]}
+    corpus = tmp_path / "corpus.jsonl"
+    lines = [json.dumps(p) for p in problems]
+    lines[7], lines[8] = "[1, 2]", "{not json"  # bad lines become error records
+    corpus.write_text("".join(line + "\n" for line in lines))
+    work = str(tmp_path / "work")
+    assert run_batch(str(corpus), work, workers=2, shard_size=3) == [0, 1, 2, 3]
+    # A crashed worker: one shard lost, another left with an abandoned lock
+    os.remove(os.path.join(work, "shards", "00001.jsonl"))
+    os.remove(os.path.join(work, "shards", "00002.jsonl"))
+    lock = os.path.join(work, "shards", "00002.lock")
+    open(lock, "w").close()
+    os.utime(lock, (0, 0))
+    assert run_batch(str(corpus), work, workers=1, shard_size=3) == [1, 2]
+    assert merge_shards(work, str(tmp_path / "out.jsonl")) == 10
+    records = [json.loads(line) for line in open(tmp_path / "out.jsonl")]
+    assert [r['index'] for r in records] == list(range(10))
+    assert [i for i, r in enumerate(records) if 'error' in r] == [4, 7, 8, 9]
+    assert records[0]['equation'] == KMapSolver(3, [0], []).solve()[0]
+    # Pooled engines and 'auto' work inside the batch workers too
+    for options in ({'engine': 'parallel'}, {'backend': 'auto'}):
+        other = str(tmp_path / f"work-{len(options)}-{sorted(options)[0]}")
+        run_batch(str(corpus), other, workers=2, shard_size=4, **options)
+        merge_shards(other, str(tmp_path / "other.jsonl"))
+        assert [json.loads(line).get('equation') for line in open(tmp_path / "other.jsonl")] == \
+            [r.get('equation') for r in records]
+    try:
+        plan_shards(str(corpus), work, shard_size=4)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+def test_solve_dual():
+    # (A+B)(C+D): 4 literals as a product of sums, 8 as a sum of products
+    on_set = [m for m in range(16) if m >> 2 and m & 3]
+    solver = KMapSolver(4, on_set, [], mode='SOP')
+    dual = solver.solve_dual(deadline=1.0)
+    assert dual['cheaper'] == 'POS' and dual['POS']['equation'] == "(A+B)(C+D)"
+    assert (dual['SOP']['terms'], dual['SOP']['literals'], dual['POS']['literals']) == (4, 8, 4)
+    assert dual['SOP']['equation'] == solver.solve()[0]
+    # Entered as maxterms, with the POS side solved in the worker pool
+    zeros = KMapSolver(4, [m for m in range(16) if m not in on_set], [], mode='POS')
+    assert zeros.solve_dual(concurrent=True)['POS']['equation'] == "(A+B)(C+D)"
+    # One deadline covers both forms, not each of them
+    import random, time
+    rng = random.Random(3)
+    hard = KMapSolver(13, [m for m in range(2**13) if rng.random() < 0.5], [])
+    start = time.perf_counter()
+    hard.solve_dual(deadline=0.5)
+    assert time.perf_counter() - start < 0.8
+    service = MinimizationService(workers=1)
+    try:
+        result = service.submit({"num_vars": 4, "minterms": on_set, "mode": "BEST"}).result(timeout=30)
+        assert result['mode'] == 'POS' and result['costs']['SOP']['literals'] == 8
+    finally:
+        service.shutdown()
+
+def test_deadline_bounds_whole_solve():
+    import random, time
+    rng = random.Random(0)
+    # Wide enough that the chart and greedy cover alone take seconds
+    for num_vars, engine in ((14, 'numpy'), (11, 'python')):
+        terms = [t for t in range(2**num_vars) if rng.random() < 0.6]
+        solver = KMapSolver(num_vars, terms, [], mode='SOP')
+        start = time.perf_counter()
+        result = solver.solve(engine=engine, deadline=0.1)
+        assert time.perf_counter() - start < 0.6
+        assert not solver.proven_minimal
+        assert set().union(*(set(g) for g in result[2])) == set(terms)
+
 if __name__ == "__main__":
     test_solver()
     test_visualizer()
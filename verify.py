@@ -0,0 +1,115 @@
+import re
+import numpy as np
+
+# Equivalence checking for solver output. A cover (list of Cube or
+# (value, mask) pairs, or an SOP/POS equation string) is evaluated over every
+# input with NumPy bit operations, or over a random sample when 2^n is too
+# large, and compared against the function it is supposed to implement.
+
+EXHAUSTIVE_LIMIT = 24  # widest function checked over all 2^n inputs by default
+
+
+def _cube_pair(cube):
+    if isinstance(cube, tuple):
+        return cube
+    return cube.value, cube.mask
+
+
+def cover_values(cubes, inputs):
+    # True wherever at least one cube covers the input
+    inputs = np.asarray(inputs, dtype=np.int64)
+    out = np.zeros(inputs.shape, dtype=bool)
+    for cube in cubes:
+        value, mask = _cube_pair(cube)
+        out |= (inputs & ~mask) == value
+    return out
+
+
+def parse_expression(expr, num_vars, mode='SOP', variables=None):
+    # Turns a _format_output equation back into (value, mask) cubes over the
+    # target set: the 1s for SOP, the 0s for POS (each sum clause is zero on
+    # exactly one cube).
+    if variables is None:
+        variables = [chr(65 + i) for i in range(num_vars)]
+    full = (1 << num_vars) - 1
+    expr = expr.replace(" ", "")
+    # Constants: SOP "0"/"1" cover nothing/everything, POS is the reverse
+    if expr in ("0", "1"):
+        covers_all = (expr == "1") == (mode == 'SOP')
+        return [(0, full)] if covers_all else []
+
+    if mode == 'SOP':
+        terms = expr.split("+")
+    else:
+        terms = re.findall(r"\(([^()]*)\)", expr)
+        if "".join(f"({t})" for t in terms) != expr:
+            raise ValueError(f"Malformed POS expression: {expr}")
+        terms = [t.replace("+", "") for t in terms]
+
+    names = "|".join(re.escape(v) for v in sorted(variables, key=len, reverse=True))
+    literal = re.compile(f"({names})('?)")
+    cubes = []
+    for term in terms:
+        if term == "1" and mode == 'SOP':
+            cubes.append((0, full))
+            continue
+        value, fixed, pos = 0, 0, 0
+        for match in literal.finditer(term):
+            if match.start() != pos:
+                break
+            pos = match.end()
+            bit = 1 << (num_vars - 1 - variables.index(match.group(1)))
+            # SOP literal A means A=1 on the cube; POS literal A means A=0 on the zero cube
+            if (match.group(2) == "") == (mode == 'SOP'):
+                value |= bit
+            fixed |= bit
+        if pos != len(term) or not term:
+            raise ValueError(f"Cannot parse term '{term}' in {expr}")
+        cubes.append((value, full & ~fixed))
+    return cubes
+
+
+def check_equivalence(num_vars, minterms, dont_cares, cover, mode='SOP', samples=None, seed=0):
+    # minterms are the target terms as given to KMapSolver (maxterms in POS
+    # mode); dont_cares may land on either side. cover is a list of cubes or
+    # an equation string. With samples=None every input is checked when
+    # num_vars <= EXHAUSTIVE_LIMIT; otherwise `samples` random inputs are.
+    if isinstance(cover, str):
+        cover = parse_expression(cover, num_vars, mode)
+    target = np.fromiter(minterms, dtype=np.int64)
+    free = np.fromiter(dont_cares, dtype=np.int64)
+
+    if samples is None and num_vars <= EXHAUSTIVE_LIMIT:
+        inputs = np.arange(1 << num_vars, dtype=np.int64)
+        expected = np.zeros(inputs.size, dtype=bool)
+        expected[target] = True
+        ignore = np.zeros(inputs.size, dtype=bool)
+        ignore[free] = True
+    else:
+        rng = np.random.default_rng(seed)
+        inputs = rng.integers(0, 1 << num_vars, size=samples or 1 << 20, dtype=np.int64)
+        # Always include the specified points, they are where bugs show up
+        inputs = np.concatenate([target, inputs])
+        expected = np.isin(inputs, target)
+        ignore = np.isin(inputs, free)
+
+    mismatch = (cover_values(cover, inputs) != expected) & ~ignore
+    return {
+        'equivalent': not mismatch.any(),
+        'mismatches': np.unique(inputs[mismatch]).tolist(),
+        'checked': int(inputs.size),
+    }
+
+
+def check_solver(solver, result=None, samples=None):
+    # Verifies both the equation string and the groups of a solve() result
+    if result is None:
+        result = solver.solve()
+    equation, logic_parts, groups = result
+    by_equation = check_equivalence(solver.num_vars, solver.target_terms, solver.dont_cares,
+                                    equation, solver.mode, samples)
+    by_groups = check_equivalence(solver.num_vars, solver.target_terms, solver.dont_cares,
+                                  groups, solver.mode, samples)
+    by_equation['equivalent'] = by_equation['equivalent'] and by_groups['equivalent']
+    by_equation['mismatches'] = sorted(set(by_equation['mismatches']) | set(by_groups['mismatches']))
+    return by_equation
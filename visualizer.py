@@ -2,6 +2,44 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import numpy as np
 
+# Grid templates and Gray-code coordinate maps, built once per num_vars and
+# shared by every visualizer in the process (see grid_layout)
+_LAYOUTS = {}
+
+GROUP_COLORS = ['#FFD700', '#FF69B4', '#00FFFF', '#ADFF2F', '#FF4500', '#9370DB']
+
+
+def grid_layout(num_vars):
+    layout = _LAYOUTS.get(num_vars)
+    if layout is not None:
+        return layout
+
+    # Configuration based on vars
+    if num_vars == 2:
+        layout = dict(rows=2, cols=2, row_labels=['0', '1'], col_labels=['0', '1'],
+                      row_vars="A", col_vars="B")
+    elif num_vars == 3:
+        layout = dict(rows=2, cols=4, row_labels=['0', '1'], col_labels=['00', '01', '11', '10'],
+                      row_vars="A", col_vars="BC")
+    elif num_vars == 4:
+        layout = dict(rows=4, cols=4, row_labels=['00', '01', '11', '10'], col_labels=['00', '01', '11', '10'],
+                      row_vars="AB", col_vars="CD")
+    else:
+        raise ValueError(f"K-maps are drawn for 2 to 4 variables, got {num_vars}")
+
+    # Gray code indices for mapping
+    layout['row_indices'] = [0, 1] if layout['rows'] == 2 else [0, 1, 3, 2]
+    layout['col_indices'] = [0, 1] if layout['cols'] == 2 else [0, 1, 3, 2]
+    col_bits = 1 if layout['cols'] == 2 else 2
+    # (row, col, minterm) for every cell, and minterm -> (row, col)
+    layout['cells'] = [(r, c, (r_val << col_bits) | c_val)
+                       for r, r_val in enumerate(layout['row_indices'])
+                       for c, c_val in enumerate(layout['col_indices'])]
+    layout['coords'] = {minterm: (r, c) for r, c, minterm in layout['cells']}
+    _LAYOUTS[num_vars] = layout
+    return layout
+
+
 class KMapVisualizer:
     def __init__(self, num_vars, minterms, dont_cares, groups, theme='dark'):
         self.num_vars = num_vars
@@ -10,55 +48,72 @@ class KMapVisualizer:
         self.groups = groups
         self.theme = theme
         
-        # Configuration based on vars
-        if num_vars == 2:
-            self.rows = 2
-            self.cols = 2
-            self.row_labels = ['0', '1']
-            self.col_labels = ['0', '1']
-            self.row_vars = "A"
-            self.col_vars = "B"
-        elif num_vars == 3:
-            self.rows = 2
-            self.cols = 4
-            self.row_labels = ['0', '1']
-            self.col_labels = ['00', '01', '11', '10']
-            self.row_vars = "A"
-            self.col_vars = "BC"
-        elif num_vars == 4:
-            self.rows = 4
-            self.cols = 4
-            self.row_labels = ['00', '01', '11', '10']
-            self.col_labels = ['00', '01', '11', '10']
-            self.row_vars = "AB"
-            self.col_vars = "CD"
-            
-        # Gray code indices for mapping
-        self.row_indices = [0, 1] if self.rows == 2 else [0, 1, 3, 2]
-        self.col_indices = [0, 1] if self.cols == 2 else [0, 1, 3, 2]
+        layout = grid_layout(num_vars)
+        self.rows = layout['rows']
+        self.cols = layout['cols']
+        self.row_labels = layout['row_labels']
+        self.col_labels = layout['col_labels']
+        self.row_vars = layout['row_vars']
+        self.col_vars = layout['col_vars']
+        self.row_indices = layout['row_indices']
+        self.col_indices = layout['col_indices']
+        self.cells = layout['cells']
+        self.coords = layout['coords']
 
     def _get_cell_coords(self, minterm):
         # Returns (row, col) in the grid (0-indexed)
-        bin_str = format(minterm, f'0{self.num_vars}b')
-        
-        if self.num_vars == 2:
-            r_val = int(bin_str[0], 2)
-            c_val = int(bin_str[1], 2)
-        elif self.num_vars == 3:
-            r_val = int(bin_str[0], 2)
-            c_val = int(bin_str[1:], 2)
-        elif self.num_vars == 4:
-            r_val = int(bin_str[:2], 2)
-            c_val = int(bin_str[2:], 2)
-            
-        r = self.row_indices.index(r_val)
-        c = self.col_indices.index(c_val)
-        return r, c
+        return self.coords[minterm]
 
     def draw(self, show_grid=True, show_indices=False, visible_values=None, visible_groups=None):
         # visible_values: list of minterms/indices to show values for
         # visible_groups: list of groups to draw
-        
+        fig, ax = self._new_figure()
+        if show_grid:
+            self._draw_grid(ax)
+        if show_indices:
+            self._draw_indices(ax)
+        if visible_values is not None:
+            self._draw_values(ax, visible_values)
+        for i, group in enumerate(visible_groups or []):
+            self._draw_group(ax, group, GROUP_COLORS[i % len(GROUP_COLORS)])
+        return fig
+
+    def frames(self):
+        # draw() arguments for each stage of a solution, in the order the app
+        # animates them: grid, indices, values, then one group at a time
+        all_values = list(range(2**self.num_vars))
+        yield dict(show_grid=True, show_indices=False, visible_values=None, visible_groups=None)
+        yield dict(show_grid=True, show_indices=True, visible_values=None, visible_groups=None)
+        yield dict(show_grid=True, show_indices=True, visible_values=all_values, visible_groups=None)
+        for i in range(1, len(self.groups) + 1):
+            yield dict(show_grid=True, show_indices=True, visible_values=all_values,
+                       visible_groups=self.groups[:i])
+
+    def frame_figures(self):
+        # The frames() sequence on a single figure: each stage adds only its
+        # own artists to what is already drawn, instead of drawing every frame
+        # from scratch. Yields the same figure once per frame, so save it
+        # before advancing; the caller closes it at the end.
+        fig, ax = self._new_figure()
+        self._draw_grid(ax)
+        yield fig
+        self._draw_indices(ax)
+        yield fig
+        self._draw_values(ax, range(2**self.num_vars))
+        yield fig
+        for i, group in enumerate(self.groups):
+            self._draw_group(ax, group, GROUP_COLORS[i % len(GROUP_COLORS)])
+            yield fig
+
+    def _colors(self):
+        # Theme-based colors
+        if self.theme == 'dark':
+            return dict(background='black', grid='white', label='#FFFF00', text='#E0FFFF',
+                        index='#CCCCCC', one='#00FF00', dont_care='#FF00FF')
+        return dict(background='white', grid='#333333', label='#004E89', text='#1F1F1F',
+                    index='#666666', one='#00AA00', dont_care='#AA00AA')
+
+    def _new_figure(self):
         fig, ax = plt.subplots(figsize=(6, 5), dpi=100)
         # Adjusted limits to prevent clipping of labels
         ax.set_xlim(-1.5, self.cols + 0.5)
@@ -66,95 +121,70 @@ class KMapVisualizer:
         ax.invert_yaxis() # 0 at top
         ax.set_aspect('equal')
         ax.axis('off')
-        
-        # Theme-based colors
-        if self.theme == 'dark':
-            BG_COLOR = 'black'
-            GRID_COLOR = 'white'
-            LABEL_COLOR = '#FFFF00'
-            TEXT_COLOR = '#E0FFFF'
-            MINTERM_NUM_COLOR = '#CCCCCC'
-        else:
-            BG_COLOR = 'white'
-            GRID_COLOR = '#333333'
-            LABEL_COLOR = '#004E89'
-            TEXT_COLOR = '#1F1F1F'
-            MINTERM_NUM_COLOR = '#666666'
-        
+
         # Set background
-        fig.patch.set_facecolor(BG_COLOR)
-        ax.set_facecolor(BG_COLOR)
-        
-        if show_grid:
-            # Draw Grid Lines with rounded style
-            for r in range(self.rows + 1):
-                ax.plot([0, self.cols], [r, r], color=GRID_COLOR, lw=2.5, alpha=0.9)
-            for c in range(self.cols + 1):
-                ax.plot([c, c], [0, self.rows], color=GRID_COLOR, lw=2.5, alpha=0.9)
-                
-            # Draw Diagonal Split
-            ax.plot([0, -0.6], [0, -0.6], color=GRID_COLOR, lw=2.5, alpha=0.9)
-            
-            # Variable Labels
-            ax.text(-0.7, 0.2, self.row_vars, ha='right', va='center', fontsize=18, 
-                    color=LABEL_COLOR, fontweight='bold')
-            ax.text(-0.1, -0.7, self.col_vars, ha='center', va='bottom', fontsize=18, 
-                    color=LABEL_COLOR, fontweight='bold')
-            
-            # Row Headers
-            for i, label in enumerate(self.row_labels):
-                ax.text(-0.1, i + 0.5, label, ha='right', va='center', fontsize=16, 
-                       color=LABEL_COLOR, fontweight='bold', fontfamily='monospace')
-                
-            # Col Headers
-            for i, label in enumerate(self.col_labels):
-                ax.text(i + 0.5, -0.1, label, ha='center', va='bottom', fontsize=16, 
-                       color=LABEL_COLOR, fontweight='bold', fontfamily='monospace')
-
-        # Fill Content (Values and Minterm Indices)
-        for r in range(self.rows):
-            for c in range(self.cols):
-                r_val = self.row_indices[r]
-                c_val = self.col_indices[c]
-                
-                if self.num_vars == 2:
-                    minterm = (r_val << 1) | c_val
-                elif self.num_vars == 3:
-                    minterm = (r_val << 2) | c_val
-                elif self.num_vars == 4:
-                    minterm = (r_val << 2) | c_val
-                
-                # Minterm Number (Top Right)
-                if show_indices:
-                    ax.text(c + 0.88, r + 0.18, str(minterm), ha='right', va='top', 
-                           fontsize=10, color=MINTERM_NUM_COLOR, fontweight='normal')
-                
-                # Value (Center)
-                if visible_values is not None and minterm in visible_values:
-                    val_text = "0"
-                    val_color = TEXT_COLOR
-                    if minterm in self.minterms:
-                        val_text = "1"
-                        val_color = '#00FF00' if self.theme == 'dark' else '#00AA00'
-                    elif minterm in self.dont_cares:
-                        val_text = "X"
-                        val_color = '#FF00FF' if self.theme == 'dark' else '#AA00AA'
-                    
-                    ax.text(c + 0.5, r + 0.55, val_text, ha='center', va='center', 
-                           fontsize=26, color=val_color, fontweight='bold')
-
-        # Draw Groups
-        if visible_groups:
-            colors = ['#FFD700', '#FF69B4', '#00FFFF', '#ADFF2F', '#FF4500', '#9370DB']
-            for i, group in enumerate(visible_groups):
-                group_color = colors[i % len(colors)]
-                self._draw_group(ax, group, group_color)
+        background = self._colors()['background']
+        fig.patch.set_facecolor(background)
+        ax.set_facecolor(background)
 
         # Explicitly set margins to ensure labels (AB, CD) are not clipped
         # left/bottom provide space for the negative coordinate labels
         # Increased top/left margins to fix clipping
-        plt.subplots_adjust(left=0.25, right=0.95, top=0.85, bottom=0.1)
-        return fig
+        fig.subplots_adjust(left=0.25, right=0.95, top=0.85, bottom=0.1)
+        return fig, ax
+
+    def _draw_grid(self, ax):
+        colors = self._colors()
+        # Draw Grid Lines with rounded style
+        for r in range(self.rows + 1):
+            ax.plot([0, self.cols], [r, r], color=colors['grid'], lw=2.5, alpha=0.9)
+        for c in range(self.cols + 1):
+            ax.plot([c, c], [0, self.rows], color=colors['grid'], lw=2.5, alpha=0.9)
+
+        # Draw Diagonal Split
+        ax.plot([0, -0.6], [0, -0.6], color=colors['grid'], lw=2.5, alpha=0.9)
+
+        # Variable Labels
+        ax.text(-0.7, 0.2, self.row_vars, ha='right', va='center', fontsize=18,
+                color=colors['label'], fontweight='bold')
+        ax.text(-0.1, -0.7, self.col_vars, ha='center', va='bottom', fontsize=18,
+                color=colors['label'], fontweight='bold')
+
+        # Row Headers
+        for i, label in enumerate(self.row_labels):
+            ax.text(-0.1, i + 0.5, label, ha='right', va='center', fontsize=16,
+                   color=colors['label'], fontweight='bold', fontfamily='monospace')
+
+        # Col Headers
+        for i, label in enumerate(self.col_labels):
+            ax.text(i + 0.5, -0.1, label, ha='center', va='bottom', fontsize=16,
+                   color=colors['label'], fontweight='bold', fontfamily='monospace')
+
+    def _draw_indices(self, ax):
+        # Minterm Number (Top Right)
+        color = self._colors()['index']
+        for r, c, minterm in self.cells:
+            ax.text(c + 0.88, r + 0.18, str(minterm), ha='right', va='top',
+                   fontsize=10, color=color, fontweight='normal')
+
+    def _draw_values(self, ax, visible_values):
+        # Value (Center)
+        colors = self._colors()
+        visible = set(visible_values)
+        for r, c, minterm in self.cells:
+            if minterm not in visible:
+                continue
+            val_text = "0"
+            val_color = colors['text']
+            if minterm in self.minterms:
+                val_text = "1"
+                val_color = colors['one']
+            elif minterm in self.dont_cares:
+                val_text = "X"
+                val_color = colors['dont_care']
+
+            ax.text(c + 0.5, r + 0.55, val_text, ha='center', va='center',
+                   fontsize=26, color=val_color, fontweight='bold')
 
     def _draw_group(self, ax, group, color):
         coords = [self._get_cell_coords(m) for m in group]
@@ -0,0 +1,104 @@
+import io
+import threading
+import time
+
+import matplotlib.pyplot as plt
+
+from kmap_logic import KMapSolver
+from metrics import METRICS
+from visualizer import KMapVisualizer, grid_layout
+
+# Process-level warm start. The first session in a fresh process would
+# otherwise pay for matplotlib's font and text layout caches, the first
+# figure and NumPy's first calls. warm_up() does all of it once per process
+# in a background thread, so it overlaps with the first user reading the
+# homepage; readiness() reports progress and sets the logicmap_ready gauge
+# behind the metrics server's /ready endpoint.
+
+WARM_NUM_VARS = (2, 3, 4)
+WARM_THEMES = ('dark', 'light')
+
+_state = {'started': False, 'done': threading.Event(), 'steps': {}, 'seconds': None, 'error': None}
+_lock = threading.Lock()
+
+
+def _warm_layouts():
+    for num_vars in WARM_NUM_VARS:
+        grid_layout(num_vars)
+
+
+def _warm_rendering():
+    # One full frame per size and theme, rendered to PNG like st.pyplot does
+    for num_vars in WARM_NUM_VARS:
+        solver = KMapSolver(num_vars, [0, 1], [2**num_vars - 1])
+        groups = solver.solve()[2]
+        for theme in WARM_THEMES:
+            visualizer = KMapVisualizer(num_vars, [0, 1], [2**num_vars - 1], groups, theme)
+            fig = visualizer.draw(show_grid=True, show_indices=True,
+                                  visible_values=list(range(2**num_vars)), visible_groups=groups)
+            fig.savefig(io.BytesIO(), format='png')
+            plt.close(fig)
+
+
+def _warm_solvers():
+    # Each engine and the trace path once, on a function with a cyclic core
+    for engine in ('python', 'numpy'):
+        solver = KMapSolver(4, [0, 1, 2, 5, 6, 7, 8, 9, 10, 13, 14, 15], [])
+        solver.solve(engine=engine, deadline=0.1)
+        list(solver.trace(engine, deadline=0.1))
+        list(solver.iter_minimal_covers(limit=2, deadline=0.1, engine=engine))
+    solver.get_output_array()
+    solver.truth_table_rows(list(range(16)))
+
+
+WARM_STEPS = (
+    ('layouts', _warm_layouts),
+    ('rendering', _warm_rendering),
+    ('solvers', _warm_solvers),
+)
+
+
+def _run():
+    start = time.perf_counter()
+    try:
+        for name, step in WARM_STEPS:
+            step_start = time.perf_counter()
+            step()
+            _state['steps'][name] = time.perf_counter() - step_start
+    except Exception as e:  # a failed warm-up only costs the first user some latency
+        _state['error'] = f"{type(e).__name__}: {e}"
+    _state['seconds'] = time.perf_counter() - start
+    METRICS.set_gauge('logicmap_warm_up_seconds', round(_state['seconds'], 3))
+    METRICS.set_gauge('logicmap_ready', 1)
+    _state['done'].set()
+
+
+def warm_up(background=True):
+    # Starts the warm-up once per process; later calls are no-ops. With
+    # background=False it runs in the calling thread and returns when done.
+    with _lock:
+        if _state['started']:
+            return
+        _state['started'] = True
+    METRICS.set_gauge('logicmap_ready', 0)
+    if background:
+        threading.Thread(target=_run, name="logicmap-warm-up", daemon=True).start()
+    else:
+        _run()
+
+
+def is_ready():
+    return _state['done'].is_set()
+
+
+def wait_ready(timeout=None):
+    return _state['done'].wait(timeout)
+
+
+def readiness():
+    return {
+        'ready': is_ready(),
+        'seconds': _state['seconds'],
+        'steps': dict(_state['steps']),
+        'error': _state['error'],
+    }